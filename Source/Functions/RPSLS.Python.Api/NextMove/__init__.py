@@ -1,26 +1,33 @@
-import logging
 import os
 
 import azure.functions as func
 
-from .next_move import predict
+from .next_move import predict, negotiate_content_type
+from .prediction_memo import get_prediction_memo
+from .profiling import profiled
+from .sampled_logging import get_request_logger
 
+request_logger = get_request_logger(__name__)
+
+@profiled
 def main(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info('Python HTTP trigger function processed a request.')
+    request_logger.info('Python HTTP trigger function processed a request.')
     # sample request url for testing in local
     # http://localhost:7071/api/challenger/move?humanPlayerName=john
     player_name = req.params.get('humanPlayerName', None)
 
     try:
         if player_name:
-            next_move = predict(player_name)
-            return func.HttpResponse(next_move)
+            content_type = negotiate_content_type(req.headers.get('Accept'))
+            next_move = predict(player_name, content_type)
+            request_logger.info('%s', get_prediction_memo())
+            return func.HttpResponse(next_move, mimetype=content_type)
         else:
             return func.HttpResponse(
                 'Please enter the required fields',
                 status_code=400
             )
     except Exception as ex:
-        logging.error(ex)
+        request_logger.error(ex)
         return func.HttpResponse('Error processing next move', status_code=500)
 
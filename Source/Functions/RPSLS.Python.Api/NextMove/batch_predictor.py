@@ -0,0 +1,173 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from .ensemble import DEFAULT_STRATEGIES, MAX_MATCH_LENGTH, STRATEGIES
+from .next_move import INTERNAL_MOVES_ENCODING, _zip_moves
+
+# longest chain of preceding moves matched by the history matching, the last
+# l of range(1, min(N, MAX_MATCH_LENGTH)) in ensemble._longest_match_candidate
+LONGEST_MATCH = MAX_MATCH_LENGTH - 1
+# outputs of the default ensemble.STRATEGIES plus the constant strategy
+N_STRATEGIES = 11
+# players are processed in chunks of similar history length to bound padding
+DEFAULT_CHUNK_SIZE = 256
+# the history matching builds (players x T x T) int8 and bool arrays, chunks
+# are cut so players * T * T stays below this budget (~15MB peak memory)
+MAX_CHUNK_CELLS = 2**21
+
+# score added to shift s when the real move is d positions away from a
+# prediction, i.e. SCORE_MATRIX[d][s] = [0, 1, -1, 1, -1][(s - d) % 5]
+_SHIFT_WEIGHTS = np.array([0, 1, -1, 1, -1], dtype=np.int64)
+SCORE_MATRIX = np.array([[_SHIFT_WEIGHTS[(s - d) % 5] for s in range(5)]
+                         for d in range(5)], dtype=np.int64)
+
+
+def check_strategies():
+    """The vectorized layout only implements the default ensemble strategies,
+    registered strategies would silently be missing from its predictions.
+    """
+    if tuple(STRATEGIES) != DEFAULT_STRATEGIES:
+        raise ValueError('The batch predictor only implements the default strategies, '
+                         f'{len(STRATEGIES) - len(DEFAULT_STRATEGIES)} strategies were registered')
+
+
+def predict_next_moves(games: List[Tuple[str, str]],
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       max_chunk_cells: int = MAX_CHUNK_CELLS) -> List[str]:
+    """Vectorized equivalent of calling _predict_next_move for every
+    (challenger_moves, human_moves) pair in games.
+    """
+    check_strategies()
+    histories = [np.array(_zip_moves(challenger_moves, human_moves), dtype=np.int8).reshape(-1, 2)
+                 for challenger_moves, human_moves in games]
+    predictions = [None] * len(histories)
+
+    # as in the scalar version, no prediction history means a random move
+    for index, history in enumerate(histories):
+        if len(history) < 2:
+            predictions[index] = random.choice(INTERNAL_MOVES_ENCODING)
+
+    pending = sorted((index for index, history in enumerate(histories) if len(history) >= 2),
+                     key=lambda index: len(histories[index]))
+    for chunk in _chunks(pending, [len(history) for history in histories], chunk_size, max_chunk_cells):
+        moves = _predict_padded([histories[index] for index in chunk])
+        for index, move in zip(chunk, moves):
+            predictions[index] = INTERNAL_MOVES_ENCODING[move]
+
+    return predictions
+
+
+def _chunks(pending: List[int], lengths: List[int], chunk_size: int, max_chunk_cells: int):
+    # pending is sorted by length, the last player of a chunk is the longest
+    chunk = []
+    for index in pending:
+        if chunk and (len(chunk) >= chunk_size or (len(chunk) + 1) * lengths[index]**2 > max_chunk_cells):
+            yield chunk
+            chunk = []
+        chunk.append(index)
+    if chunk:
+        yield chunk
+
+
+def _predict_padded(histories: List[np.ndarray]) -> np.ndarray:
+    n_players = len(histories)
+    lengths = np.array([len(history) for history in histories])
+    T = lengths.max()
+
+    hist = np.zeros((n_players, T, 2), dtype=np.int8)
+    for p, history in enumerate(histories):
+        hist[p, :len(history)] = history
+
+    # pred_hist[p, b] are the strategy predictions for the prefix hist[p, :b+1]
+    pred_hist = _strategy_predictions(hist)
+
+    # how would the different predictions have scored?
+    # pred_hist[p, b] is checked against the real move at b+1, for 1 <= b <= len-2
+    steps = np.arange(T)
+    scored = (steps[None, :-1] >= 1) & (steps[None, :-1] <= lengths[:, None] - 2)
+    real = hist[:, 1:, 1].astype(np.int64)
+    distance = (real[:, :, None] - pred_hist[:, :-1, :]) % 5
+    distance_counts = np.zeros((n_players, N_STRATEGIES, 5), dtype=np.int64)
+    for d in range(5):
+        distance_counts[:, :, d] = ((distance == d) & scored[:, :, None]).sum(axis=1)
+    scores = distance_counts @ SCORE_MATRIX
+
+    # depending in predicted strategies, select best one with less risks
+    shifts = scores.argmax(axis=2)
+    best = scores.max(axis=2).astype(np.float64)
+    best[:, -1] *= 1.001   # bias towards the simplest strategy
+    low = best[:, -1] < 0.4 * lengths
+    best[low, -1] *= 1.4
+    strats = best.argmax(axis=1)
+
+    players = np.arange(n_players)
+    last = pred_hist[players, lengths - 1, strats]
+    return (last + shifts[players, strats]) % 5
+
+
+def _strategy_predictions(hist: np.ndarray) -> np.ndarray:
+    n_players, T, _ = hist.shape
+    pred_hist = np.zeros((n_players, T, N_STRATEGIES), dtype=np.int64)
+
+    # repeat last moves
+    pred_hist[:, 1:, 0] = hist[:, 1:, 0]
+    pred_hist[:, 1:, 1] = hist[:, 1:, 1]
+    pred_hist[:, 1:, 2] = hist[:, :-1, 0]
+    pred_hist[:, 1:, 3] = hist[:, :-1, 1]
+
+    # history matching of my own moves, opponent's moves and both
+    equal_m = hist[:, :, None, 0] == hist[:, None, :, 0]
+    equal_o = hist[:, :, None, 1] == hist[:, None, :, 1]
+    matched_m = _history_match(equal_m)
+    matched_o = _history_match(equal_o)
+    matched_b = _history_match(equal_m & equal_o)
+    players = np.arange(n_players)[:, None]
+    pred_hist[:, :, 4] = hist[players, matched_m + 1, 0]
+    pred_hist[:, :, 5] = hist[players, matched_o + 1, 1]
+    pred_hist[:, :, 6] = hist[players, matched_b + 1, 0]
+    pred_hist[:, :, 7] = hist[players, matched_b + 1, 1]
+
+    # most frequent moves so far, ties resolved to the lowest move like list.index
+    played = np.arange(5)
+    freq_m = np.cumsum(hist[:, :, 0, None] == played, axis=1)
+    freq_o = np.cumsum(hist[:, :, 1, None] == played, axis=1)
+    pred_hist[:, :, 8] = freq_m.argmax(axis=2)
+    pred_hist[:, :, 9] = freq_o.argmax(axis=2)
+
+    # last strategy is the constant 0
+    return pred_hist
+
+
+def _history_match(equal: np.ndarray) -> np.ndarray:
+    """For every prefix ending at b, index c of the candidate selected by the
+    longest match loop of ensemble._longest_match_candidate (equal[p, a, b] tells
+    whether moves a and b are the same).
+    """
+    n_players, T, _ = equal.shape
+
+    # run[p, c, b]: length of the common run of moves ending at c and at b,
+    # capped to LONGEST_MATCH and never reaching the first move
+    # (candidates need c >= l in the scalar loop)
+    run = np.zeros(equal.shape, dtype=np.int8)
+    matching = equal.copy()
+    for j in range(LONGEST_MATCH):
+        if j:
+            matching[:, j:, j:] &= equal[:, :-j, :-j]
+            matching[:, :j, :] = False
+        run += matching
+    c_index = np.arange(T)
+    # kept as int8, the cap never exceeds LONGEST_MATCH
+    run = np.minimum(run, np.minimum(c_index, LONGEST_MATCH).astype(np.int8)[None, :, None])
+
+    # candidates for the prefix ending at b are c < b
+    candidate = c_index[:, None] < c_index[None, :]
+    run = np.where(candidate[None], run, np.int8(-1))
+
+    # the prefix ending at b (N = b + 1 rounds) matches chains up to min(N, MAX_MATCH_LENGTH) - 1
+    longest = np.minimum(run.max(axis=1), np.minimum(c_index + 1, MAX_MATCH_LENGTH) - 1)
+    selected = (run >= longest[:, None, :]) & candidate[None]
+    # latest candidate among the longest matches, 0 for prefixes without any
+    return np.where(selected.any(axis=1),
+                    T - 1 - selected[:, ::-1, :].argmax(axis=1), 0)
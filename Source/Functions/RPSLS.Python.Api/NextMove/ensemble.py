@@ -0,0 +1,240 @@
+import os
+from typing import Callable, List, Optional, Tuple
+
+# Ensemble of the strategies used by the predictor. Every strategy follows the
+# game round by round (update) and proposes one or more moves for the next
+# round (predict); the ensemble scores each proposal against the move the
+# human really played and plays the best one.
+
+History = List[Tuple[int, int]]
+
+# longest chain of preceding moves looked up by the history matching
+MAX_MATCH_LENGTH = 20
+
+
+class Strategy:
+    name = ''
+    # number of moves proposed by predict
+    n_outputs = 1
+    # approximate CPU microseconds of update and predict per round on an 80
+    # rounds history (checked by test_declared_strategy_costs), used to
+    # estimate the evaluations skipped by pruning
+    cost = 1.0
+    # the constant strategy is the fallback and is never pruned
+    prunable = True
+
+    def update(self, history: History, N: int):
+        """history[N-1] has just been played"""
+
+    def predict(self, history: History, N: int) -> List[int]:
+        raise NotImplementedError
+
+
+class LastMoves(Strategy):
+    name = 'last_moves'
+    n_outputs = 4
+    cost = 0.5
+
+    def predict(self, history: History, N: int) -> List[int]:
+        # repeat last moves
+        return [history[N-1][0], history[N-1][1], history[N-2][0], history[N-2][1]]
+
+
+class HistoryMatch(Strategy):
+    cost = 8.0
+
+    def __init__(self, name: str, key: Optional[int], outputs: List[int]):
+        self.name = name
+        # 0 matches my moves, 1 the opponent's moves and None both
+        self.key = key
+        self.outputs = outputs
+        self.n_outputs = len(outputs)
+
+    def predict(self, history: History, N: int) -> List[int]:
+        candidate = _longest_match_candidate(history, N, self.key)
+        return [history[candidate+1][output] for output in self.outputs]
+
+
+class MostFrequent(Strategy):
+    def __init__(self, name: str, key: int):
+        self.name = name
+        self.key = key
+        self.freq = [0]*5
+
+    def update(self, history: History, N: int):
+        self.freq[history[N-1][self.key]] += 1
+
+    def predict(self, history: History, N: int) -> List[int]:
+        return [self.freq.index(max(self.freq))]
+
+
+class Constant(Strategy):
+    name = 'constant'
+    cost = 0.3
+    prunable = False
+
+    def predict(self, history: History, N: int) -> List[int]:
+        return [0]
+
+
+def _longest_match_candidate(history: History, N: int, key: Optional[int]) -> int:
+    # find longest match of the preceding moves in the earlier history
+    cand = range(N-1)
+
+    for l in range(1, min(N, MAX_MATCH_LENGTH)):
+        ref = history[N-l]
+
+        # l = 1
+        # Looks for previous occurrences of the last move, since history[N-l] == history[-1]
+        # l = 2
+        # it checks which of the possible candidates was preceded by the move previous to the last
+        # and so on... i.e looks for longest chain matching last moves to use the next move
+        if key is None:
+            cand_tmp = [c for c in cand if c >= l and history[c-l+1] == ref]
+        else:
+            cand_tmp = [c for c in cand if c >= l and history[c-l+1][key] == ref[key]]
+        if not cand_tmp:
+            cand = cand[-1:]
+        else:
+            cand = cand_tmp
+        # a single candidate is kept whatever the following moves
+        if len(cand) == 1:
+            break
+
+    return cand[-1]
+
+
+# registered strategy factories, in the order of their proposals
+STRATEGIES: List[Callable[[], Strategy]] = [
+    LastMoves,
+    lambda: HistoryMatch('match_mine', 0, [0]),      # history matching of my own moves
+    lambda: HistoryMatch('match_opponent', 1, [1]),  # history matching of opponent's moves
+    lambda: HistoryMatch('match_both', None, [0, 1]),  # history matching of both
+    lambda: MostFrequent('frequent_mine', 0),      # my most frequent move
+    lambda: MostFrequent('frequent_opponent', 1),  # opponent's most frequent move
+]
+
+# the strategies implemented by the vectorized batch_predictor
+DEFAULT_STRATEGIES = tuple(STRATEGIES)
+
+
+def register_strategy(factory: Callable[[], Strategy]):
+    STRATEGIES.append(factory)
+
+
+class Pruning:
+    """Strategies whose best score stays more than margin points below the
+    leader for patience rounds are no longer evaluated, and are probed again
+    probe_interval rounds later.
+    """
+
+    def __init__(self, margin: float = 5, patience: int = 3, probe_interval: int = 10):
+        self.margin = margin
+        self.patience = patience
+        self.probe_interval = probe_interval
+
+    @classmethod
+    def from_env(cls) -> Optional['Pruning']:
+        if os.getenv('PREDICTOR_PRUNING', 'false').lower() != 'true':
+            return None
+        return cls(float(os.getenv('PREDICTOR_PRUNING_MARGIN', '5')),
+                   int(os.getenv('PREDICTOR_PRUNING_PATIENCE', '3')),
+                   int(os.getenv('PREDICTOR_PRUNING_PROBE_INTERVAL', '10')))
+
+
+class Ensemble:
+    def __init__(self, factories: Optional[List[Callable[[], Strategy]]] = None,
+                 pruning: Optional[Pruning] = None):
+        self.factories = STRATEGIES if factories is None else factories
+        self.pruning = pruning
+        # cost of the evaluated strategies vs. the cost without pruning
+        self.evaluated_cost = 0.0
+        self.total_cost = 0.0
+
+    def predict(self, history: History) -> int:
+        """Next move for a history of at least 2 rounds"""
+        # the constant strategy is always last, it gets the simplest strategy bias
+        strategies = [factory() for factory in self.factories] + [Constant()]
+        outputs = []
+        for index, strategy in enumerate(strategies):
+            outputs += [index]*strategy.n_outputs
+        scores = [[0]*5 for _ in outputs]
+        predictions = [None]*len(outputs)
+        pruned_at = [None]*len(strategies)
+        below_leader = [0]*len(strategies)
+
+        for N in range(1, len(history)+1):
+            for strategy in strategies:
+                strategy.update(history, N)
+            if N < 2:
+                continue
+
+            # how would the previous predictions have scored?
+            # check https://i.stack.imgur.com/jILea.png for game rules
+            real = history[N-1][1]
+            for i, prediction in enumerate(predictions):
+                if prediction is None:
+                    continue
+                # %5: When an int is negative it returns the count to the move
+                # to beat another, in (reverse order) counterclockwise
+                # 1 & 3 move to the other "moves" that beat another
+                scores[i][(real-prediction+1) % 5] += 1
+                scores[i][(real-prediction+3) % 5] += 1
+                scores[i][(real-prediction+2) % 5] -= 1
+                scores[i][(real-prediction+4) % 5] -= 1
+
+            if self.pruning:
+                self._prune(strategies, outputs, scores, pruned_at, below_leader, N)
+
+            predictions = []
+            for index, strategy in enumerate(strategies):
+                self.total_cost += strategy.cost
+                if pruned_at[index] is None:
+                    self.evaluated_cost += strategy.cost
+                    predictions += strategy.predict(history, N)
+                else:
+                    predictions += [None]*strategy.n_outputs
+
+        # depending in predicted strategies, select best one with less risks
+        # return best counter move
+        best_scores = [list(max(enumerate(s), key=lambda x: x[1])) for s in scores]
+        best_scores[-1][1] *= 1.001   # bias towards the simplest strategy
+        if best_scores[-1][1] < 0.4*len(history):
+            best_scores[-1][1] *= 1.4
+        for i, prediction in enumerate(predictions):
+            if prediction is None:
+                best_scores[i][1] = float('-inf')
+        strat, (shift, _) = max(enumerate(best_scores), key=lambda x: x[1][1])
+
+        return (predictions[strat]+shift) % 5
+
+    def _prune(self, strategies, outputs, scores, pruned_at, below_leader, N):
+        strengths = [float('-inf')]*len(strategies)
+        for i, index in enumerate(outputs):
+            strengths[index] = max(strengths[index], max(scores[i]))
+        leader = max(strength for index, strength in enumerate(strengths) if pruned_at[index] is None)
+
+        for index, strategy in enumerate(strategies):
+            if not strategy.prunable:
+                continue
+            if pruned_at[index] is not None:
+                # probe it again
+                if N - pruned_at[index] >= self.pruning.probe_interval:
+                    pruned_at[index] = None
+                    below_leader[index] = 0
+            elif strengths[index] < leader - self.pruning.margin:
+                below_leader[index] += 1
+                if below_leader[index] >= self.pruning.patience:
+                    pruned_at[index] = N
+            else:
+                below_leader[index] = 0
+
+
+_ensemble: Optional[Ensemble] = None
+
+
+def get_ensemble() -> Ensemble:
+    global _ensemble
+    if _ensemble is None:
+        _ensemble = Ensemble(pruning=Pruning.from_env())
+    return _ensemble
@@ -0,0 +1,84 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# how often the memo statistics are logged, in lookups
+STATS_LOG_INTERVAL = 10000
+
+
+class PredictionMemo:
+    """Bounded LRU table of predictions shared by all players, keyed by the
+    full history of short games. Many players (bots, new humans) share the
+    same short histories, so their prediction is only computed once.
+
+    stats() is the interface to the hit rate metrics, they are also logged
+    every STATS_LOG_INTERVAL lookups and with the sampled request logs.
+    """
+
+    def __init__(self, max_size: int = 10000, max_rounds: int = 20):
+        self.max_size = max_size
+        self.max_rounds = max_rounds
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self._predictions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'PredictionMemo':
+        return cls(int(os.getenv('PREDICTION_MEMO_SIZE', '10000')),
+                   int(os.getenv('PREDICTION_MEMO_MAX_ROUNDS', '20')))
+
+    def predict(self, predict_next_move: Callable[[str, str], str],
+                challenger_moves: str, human_moves: str) -> str:
+        rounds = min(len(challenger_moves), len(human_moves))
+        # under 2 rounds the prediction is random, so it is never memoized
+        if rounds < 2 or rounds > self.max_rounds or not self.max_size:
+            self.bypassed += 1
+            return predict_next_move(challenger_moves, human_moves)
+
+        key = (challenger_moves[:rounds], human_moves[:rounds])
+        with self._lock:
+            prediction = self._predictions.get(key)
+            if prediction is not None:
+                self._predictions.move_to_end(key)
+                self.hits += 1
+                self._log_stats()
+                return prediction
+
+        prediction = predict_next_move(challenger_moves, human_moves)
+        with self._lock:
+            self.misses += 1
+            self._predictions[key] = prediction
+            while len(self._predictions) > self.max_size:
+                self._predictions.popitem(last=False)
+                self.evictions += 1
+            self._log_stats()
+        return prediction
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {'size': len(self._predictions), 'hits': self.hits, 'misses': self.misses,
+                'bypassed': self.bypassed, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __str__(self) -> str:
+        # logged as a lazy argument, the stats are only built for records that are emitted
+        return f'prediction memo stats: {self.stats()}'
+
+    def _log_stats(self):
+        if (self.hits + self.misses) % STATS_LOG_INTERVAL == 0:
+            logging.info('prediction memo stats: %s', self.stats())
+
+
+_memo: Optional[PredictionMemo] = None
+
+
+def get_prediction_memo() -> PredictionMemo:
+    global _memo
+    if _memo is None:
+        _memo = PredictionMemo.from_env()
+    return _memo
@@ -0,0 +1,27 @@
+import logging
+import os
+import random
+
+# SamplingFilter and get_request_logger are duplicated in app/log_pipeline.py of
+# RPSLS.PythonPlayer.Api: both services are deployed from their own folders and
+# can't share a module, changes must be made to both copies.
+
+
+class SamplingFilter(logging.Filter):
+    """Samples info and debug records, warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+def get_request_logger(name: str) -> logging.Logger:
+    # records still propagate to the root logger handled by the Functions worker,
+    # a background queue would lose the invocation context the worker relies on
+    logger = logging.getLogger(name)
+    if not any(isinstance(log_filter, SamplingFilter) for log_filter in logger.filters):
+        logger.addFilter(SamplingFilter(float(os.getenv('LOG_SAMPLE_RATE', '1'))))
+    return logger
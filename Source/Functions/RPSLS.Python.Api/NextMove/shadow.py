@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Shadow mode: SHADOW_ENGINE names a candidate engine that is run on the same
+# games as the primary _predict_next_move, in a background worker and never
+# on the request path. Each prediction is recorded to SHADOW_RECORDS_PATH as
+# a json line with the time taken by each engine (none for the primary when
+# its prediction came from the prediction memo), and once the next round of
+# the player is known, an outcome line with how the move of each engine would
+# have scored against it.
+
+Engine = Callable[[str, str], str]
+
+
+def _load_engines() -> Dict[str, Engine]:
+    from .batch_predictor import predict_next_moves
+    from .ensemble import Ensemble, Pruning
+    from .next_move import INTERNAL_MOVES_ENCODING, _predict_next_move, _zip_moves
+    pruned_ensemble = Ensemble(pruning=Pruning())
+
+    def pruned(challenger_moves: str, human_moves: str) -> str:
+        history = _zip_moves(challenger_moves, human_moves)
+        if len(history) < 2:
+            return _predict_next_move(challenger_moves, human_moves)
+        return INTERNAL_MOVES_ENCODING[pruned_ensemble.predict(history)]
+
+    return {
+        'scalar': _predict_next_move,
+        'batch': lambda challenger_moves, human_moves: predict_next_moves([(challenger_moves, human_moves)])[0],
+        'pruned': pruned,
+    }
+
+
+def _round_result(move: str, human_move: str) -> str:
+    from .next_move import INTERNAL_MOVES_ENCODING
+    # each move beats the ones 1 & 3 positions before it
+    distance = (INTERNAL_MOVES_ENCODING.index(move) - INTERNAL_MOVES_ENCODING.index(human_move)) % 5
+    if distance == 0:
+        return 'tie'
+    return 'win' if distance in (1, 3) else 'loss'
+
+
+class ShadowEvaluator:
+    def __init__(self, candidate_name: str, candidate: Engine, records_path: str,
+                 max_queue: int = 1000, max_players: int = 10000):
+        self.candidate_name = candidate_name
+        self.candidate = candidate
+        self.records_path = records_path
+        self.max_players = max_players
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        # last predictions per player, waiting for the next real round
+        self._pending = OrderedDict()
+        self._worker = threading.Thread(target=self._run, name='shadow-predictor', daemon=True)
+        self._worker.start()
+
+    def observe(self, player_name: str, challenger_moves: str, human_moves: str,
+                primary_move: str, primary_seconds: Optional[float]):
+        try:
+            self._queue.put_nowait((player_name, challenger_moves, human_moves, primary_move, primary_seconds))
+        except queue.Full:
+            # shadow evaluation never slows down the primary prediction
+            self.dropped += 1
+
+    def join(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            observation = self._queue.get()
+            try:
+                self._evaluate(*observation)
+            except Exception as ex:
+                self._write({'type': 'error', 'error': str(ex)})
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, player_name: str, challenger_moves: str, human_moves: str,
+                  primary_move: str, primary_seconds: Optional[float]):
+        rounds = min(len(challenger_moves), len(human_moves))
+
+        pending = self._pending.pop(player_name, None)
+        if pending and rounds > pending['rounds']:
+            human_move = human_moves[pending['rounds']]
+            self._write({'type': 'outcome', 'player': player_name, 'rounds': pending['rounds'],
+                         'candidate_engine': self.candidate_name, 'human': human_move,
+                         'primary_result': _round_result(pending['primary'], human_move),
+                         'candidate_result': _round_result(pending['candidate'], human_move)})
+
+        start = time.perf_counter()
+        candidate_move = self.candidate(challenger_moves, human_moves)
+        candidate_seconds = time.perf_counter() - start
+
+        self._write({'type': 'prediction', 'player': player_name, 'rounds': rounds,
+                     'candidate_engine': self.candidate_name,
+                     'primary': primary_move, 'candidate': candidate_move,
+                     'agree': primary_move == candidate_move,
+                     'memo_hit': primary_seconds is None,
+                     'primary_ms': None if primary_seconds is None else primary_seconds * 1000,
+                     'candidate_ms': candidate_seconds * 1000})
+
+        self._pending[player_name] = {'rounds': rounds, 'primary': primary_move, 'candidate': candidate_move}
+        while len(self._pending) > self.max_players:
+            self._pending.popitem(last=False)
+
+    def _write(self, record: dict):
+        with open(self.records_path, 'a') as records:
+            records.write(json.dumps(record) + '\n')
+
+
+_evaluator = None
+_evaluator_lock = threading.Lock()
+_configured = False
+
+
+def get_shadow_evaluator() -> Optional[ShadowEvaluator]:
+    global _evaluator, _configured
+    if _configured:
+        return _evaluator
+    with _evaluator_lock:
+        if not _configured:
+            # a broken shadow configuration disables shadow mode, never the predictor
+            try:
+                _evaluator = _create_evaluator(os.getenv('SHADOW_ENGINE', ''))
+            except Exception:
+                logging.exception('Unable to start shadow mode, shadow mode disabled')
+            finally:
+                _configured = True
+    return _evaluator
+
+
+def _create_evaluator(candidate_name: str) -> Optional[ShadowEvaluator]:
+    if not candidate_name:
+        return None
+    engines = _load_engines()
+    if candidate_name not in engines:
+        logging.error("Unknown SHADOW_ENGINE '%s', shadow mode disabled. Available engines: %s",
+                      candidate_name, ', '.join(sorted(engines)))
+        return None
+    if candidate_name == 'batch':
+        from .batch_predictor import check_strategies
+        check_strategies()
+    return ShadowEvaluator(
+        candidate_name,
+        engines[candidate_name],
+        os.getenv('SHADOW_RECORDS_PATH', os.path.join(tempfile.gettempdir(), 'shadow-predictions.jsonl')),
+        max_queue=int(os.getenv('SHADOW_MAX_QUEUE', '1000')))
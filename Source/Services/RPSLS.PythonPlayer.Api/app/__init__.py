@@ -1,29 +1,60 @@
-from flask import Flask, request
-from healthcheck import HealthCheck
-from applicationinsights.flask.ext import AppInsights
+from flask import Flask, Response, request
 
 import logging
 import os
 
 from .pick import Picker
+from .profiling import profiled
+from .metrics import render_metrics
+from .log_pipeline import start_queue_logging
+from .readiness import get_dependency_probes
 
 app = Flask(__name__)
 appinsightskey = os.getenv('APPLICATION_INSIGHTS_IKEY', '')
 if appinsightskey:
+    # only imported when instrumentation is enabled, it is slow to import
+    from applicationinsights.flask.ext import AppInsights
     app.config['APPINSIGHTS_INSTRUMENTATIONKEY'] = appinsightskey
     # log requests, traces and exceptions to the Application Insights service
     appinsights = AppInsights(app)
 
-health = HealthCheck()
+health = None
+readiness_check = None
 
-app.add_url_rule("/healthcheck", "healthcheck", view_func=lambda: health.run())
-app.add_url_rule('/pick', 'pick', view_func=Picker.as_view('picker'))
+def healthcheck():
+    # created on the first probe to keep it out of the startup path
+    global health
+    if health is None:
+        from healthcheck import HealthCheck
+        health = HealthCheck()
+    return health.run()
+
+def predictor_ready():
+    return get_dependency_probes().ready()
+
+def readycheck():
+    # the check only reads the results cached by the background probes
+    global readiness_check
+    if readiness_check is None:
+        from healthcheck import HealthCheck
+        readiness_check = HealthCheck(success_ttl=0, failed_status=503, failed_ttl=0, checkers=[predictor_ready])
+    return readiness_check.run()
+
+# liveness only tells the process answers, readiness that picks are served quickly
+app.add_url_rule("/healthcheck", "healthcheck", view_func=healthcheck)
+app.add_url_rule("/live", "live", view_func=healthcheck)
+app.add_url_rule("/ready", "ready", view_func=readycheck)
+app.add_url_rule('/metrics', 'metrics', view_func=lambda: Response(render_metrics(), mimetype='text/plain'))
+app.add_url_rule('/pick', 'pick', view_func=profiled(Picker.as_view('picker')))
 
 if __name__ == "__main__":
     app.run(threaded=True)
 else:
     gunicorn_logger = logging.getLogger('gunicorn.error')
-    app.logger.handlers = gunicorn_logger.handlers
+    start_queue_logging(app.logger, gunicorn_logger.handlers)
     app.logger.setLevel(gunicorn_logger.level)
 
+# warm-up starts with the worker, not on the first readiness probe
+get_dependency_probes()
+
 app.logger.info('Configured pick strategy with \'%s\'', Picker.get_strategy())
@@ -0,0 +1,45 @@
+import atexit
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+# SamplingFilter and get_request_logger are duplicated in NextMove/sampled_logging.py
+# of RPSLS.Python.Api: both services are deployed from their own folders and
+# can't share a module, changes must be made to both copies.
+
+# Sampling of the per-request info logs, warnings and errors always pass
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+def get_request_logger(name):
+    logger = logging.getLogger(name)
+    if not any(isinstance(log_filter, SamplingFilter) for log_filter in logger.filters):
+        logger.addFilter(SamplingFilter(float(os.getenv('LOG_SAMPLE_RATE', '1'))))
+    return logger
+
+# Records are queued as they are, message formatting happens on the listener thread
+class _LazyQueueHandler(QueueHandler):
+    def prepare(self, record):
+        return record
+
+class _Listener(QueueListener):
+    def stop(self):
+        # stopped on exit, possibly once more after an explicit stop
+        if self._thread is not None:
+            super().stop()
+
+def start_queue_logging(logger, handlers):
+    """Moves the handlers of logger to a background QueueListener thread"""
+    log_queue = queue.SimpleQueue()
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [_LazyQueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
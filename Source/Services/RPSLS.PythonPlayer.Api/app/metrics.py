@@ -0,0 +1,71 @@
+import threading
+from bisect import bisect_left
+
+# in-process metrics exposed in the prometheus text format on /metrics
+_registry = []
+
+class Counter:
+    def __init__(self, name, description, label_name=None):
+        self.name = name
+        self.description = description
+        self.label_name = label_name
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, label=None, amount=1):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def value(self, label=None):
+        return self._values.get(label, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        for label, value in sorted(self._values.items(), key=lambda item: str(item[0])):
+            labels = f'{{{self.label_name}="{label}"}}' if self.label_name else ''
+            lines.append(f'{self.name}{labels} {value}')
+        return lines
+
+class Gauge:
+    def __init__(self, name, description, read):
+        self.name = name
+        self.description = description
+        self.read = read
+        _registry.append(self)
+
+    def render(self):
+        return [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} gauge',
+                f'{self.name} {self.read()}']
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.buckets + ['+Inf'], self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_sum {self._sum}')
+        lines.append(f'{self.name}_count {cumulative}')
+        return lines
+
+def render_metrics():
+    return '\n'.join(line for metric in _registry for line in metric.render()) + '\n'
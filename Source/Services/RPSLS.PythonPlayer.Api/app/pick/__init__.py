@@ -1,41 +1,73 @@
 from flask.views import View
-from flask import request, current_app as app
+from flask import request
 import os
 
 from .rpsls import RPSLS
-from .rpsls_dto import get_rpsls_dto_json
+from .rpsls_dto import get_rpsls_dto_response, get_rpsls_dtos_response, SUPPORTED_CONTENT_TYPES, JSON_CONTENT_TYPE
 from .strategies import fixed_strategy, random_strategy, iterative_strategy
 from .proxy_predictor import get_pick_predicted
+from .admission import admission, rate_limiter
+from ..log_pipeline import get_request_logger
 
-strategy_map = {
-    'rock': fixed_strategy(RPSLS.rock),
-    'paper': fixed_strategy(RPSLS.paper),
-    'scissors': fixed_strategy(RPSLS.scissors),
-    'lizard': fixed_strategy(RPSLS.lizard),
-    'spock': fixed_strategy(RPSLS.spock),
-    'random': random_strategy(),
-    'iterative': iterative_strategy()
+strategy_factories = {
+    'rock': lambda: fixed_strategy(RPSLS.rock),
+    'paper': lambda: fixed_strategy(RPSLS.paper),
+    'scissors': lambda: fixed_strategy(RPSLS.scissors),
+    'lizard': lambda: fixed_strategy(RPSLS.lizard),
+    'spock': lambda: fixed_strategy(RPSLS.spock),
+    'random': random_strategy,
+    'iterative': iterative_strategy
 }
 
+# strategies are only built once they are first played
+strategy_map = {}
+
+def get_strategy_pick(strategy):
+    pick = strategy_map.get(strategy)
+    if pick is None:
+        pick = strategy_map.setdefault(strategy, strategy_factories[strategy]())
+    return pick
+
+request_logger = get_request_logger(__name__)
+
 class Picker(View):
     def dispatch_request(self):
         username = request.args.get('username', '')
+        content_type = request.accept_mimetypes.best_match(SUPPORTED_CONTENT_TYPES, JSON_CONTENT_TYPE)
 
-        if(username != ''):
+        # the next count moves of the strategy, for callers prefetching picks
+        # of bots that don't depend on the opponent
+        if 'count' in request.args:
+            count = request.args.get('count', type=int)
+            if count is None or not 1 <= count <= self.get_max_count():
+                return f'count must be between 1 and {self.get_max_count()}', 400
+            strategy = self.get_strategy()
+            results = get_strategy_pick(strategy)(count, username)
+            request_logger.info('Against user [%s], strategy %s played %d moves', username, strategy, count)
+            return get_rpsls_dtos_response(results, content_type)
+
+        # over capacity or over the client rate, answer with the local strategy
+        if(username != '' and rate_limiter.allow(username) and admission.try_acquire()):
             try:
                 predicted_result = get_pick_predicted(username)
-                app.logger.info(f'Against user [{username}] predictor played {predicted_result.name}')
-                return get_rpsls_dto_json(predicted_result)
+                request_logger.info('Against user [%s] predictor played %s', username, predicted_result.name)
+                return get_rpsls_dto_response(predicted_result, content_type)
             except Exception as ex:
-                app.logger.error(ex)
+                request_logger.error(ex)
+            finally:
+                admission.release()
 
         strategy = self.get_strategy()
-        pick = strategy_map[strategy]
-        result = pick()
-        app.logger.info(f'Against some user, strategy {strategy} played {result.name}')
-        return get_rpsls_dto_json(result)
+        pick = get_strategy_pick(strategy)
+        result = pick(1, username)[0]
+        request_logger.info('Against some user, strategy %s played %s', strategy, result.name)
+        return get_rpsls_dto_response(result, content_type)
 
     @staticmethod
     def get_strategy():
         default_value = 'random'
-        return os.getenv('PICK_STRATEGY', default_value)
\ No newline at end of file
+        return os.getenv('PICK_STRATEGY', default_value)
+
+    @staticmethod
+    def get_max_count():
+        return int(os.getenv('PICK_MAX_COUNT', '100'))
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ..metrics import Counter, Gauge, Histogram
+
+shed_requests = Counter('pick_shed_requests_total',
+                        'Picks answered with the local strategy instead of the predictor', 'reason')
+queue_wait_seconds = Histogram('pick_queue_wait_seconds',
+                               'Time waited for a predictor slot',
+                               [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5])
+
+# Admission control for predictor calls: at most max_in_flight run at once,
+# up to max_queue requests wait queue_timeout seconds for a free slot and
+# the rest are shed to the local strategy straight away
+class AdmissionController:
+    def __init__(self, max_in_flight, max_queue, queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(int(os.getenv('PICK_MAX_IN_FLIGHT', '4')),
+                   int(os.getenv('PICK_MAX_QUEUE', '8')),
+                   float(os.getenv('PICK_QUEUE_TIMEOUT_MS', '50')) / 1000)
+
+    def try_acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_queue:
+                    shed_requests.inc('queue_full')
+                    return False
+                self.waiting += 1
+            start = time.perf_counter()
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            queue_wait_seconds.observe(time.perf_counter() - start)
+            with self._lock:
+                self.waiting -= 1
+            if not acquired:
+                shed_requests.inc('queue_timeout')
+                return False
+        else:
+            queue_wait_seconds.observe(0)
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+# Token bucket per client, rate tokens per second up to burst,
+# a rate of 0 disables the limit
+class RateLimiter:
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        rate = float(os.getenv('PICK_RATE_LIMIT_PER_SECOND', '0'))
+        return cls(rate, float(os.getenv('PICK_RATE_LIMIT_BURST', str(max(rate, 1)))))
+
+    def allow(self, client, now=None):
+        if not self.rate:
+            return True
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            # forget the least recently seen clients
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            shed_requests.inc('rate_limited')
+        return allowed
+
+admission = AdmissionController.from_env()
+rate_limiter = RateLimiter.from_env()
+
+Gauge('pick_in_flight', 'Predictor calls in flight', lambda: admission.in_flight)
+Gauge('pick_queue_waiting', 'Picks waiting for a predictor slot', lambda: admission.waiting)
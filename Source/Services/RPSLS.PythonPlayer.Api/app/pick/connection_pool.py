@@ -0,0 +1,96 @@
+import http.client
+import threading
+import urllib.parse
+
+# keep-alive connections to the predictors, reused across picks instead of
+# opening a new TCP (and TLS) connection for every predicted move
+
+class ConnectionPool:
+    def __init__(self, max_idle=5):
+        # idle connections kept per host, one per gunicorn thread is enough
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        """GET url, returns the response headers and body, raises OSError on
+        connection errors and non 2xx responses
+        """
+        key, path = _split_url(url)
+        connection = self._acquire(key)
+        if connection is not None:
+            try:
+                return self._get(key, connection, path, headers, timeout)
+            except ConnectionError:
+                # the server closed the idle connection, retried on a new one
+                pass
+        return self._get(key, self._connect(key, timeout), path, headers, timeout)
+
+    def warm(self, url, count, headers=None, timeout=None):
+        """Opens count connections to the host of url with a GET on each,
+        returns how many of them answered
+        """
+        key, path = _split_url(url)
+        connections = [self._connect(key, timeout) for _ in range(count)]
+        warmed = 0
+        for connection in connections:
+            try:
+                self._get(key, connection, path, headers, timeout)
+                warmed += 1
+            except OSError:
+                pass
+        return warmed
+
+    def idle_connections(self):
+        with self._lock:
+            return sum(len(connections) for connections in self._idle.values())
+
+    def _get(self, key, connection, path, headers, timeout):
+        try:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except http.client.HTTPException as ex:
+            connection.close()
+            raise ConnectionError(f'{key[1]}: {ex!r}') from ex
+        except OSError:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        if not 200 <= response.status < 300:
+            raise OSError(f'{key[1]} answered {response.status} {response.reason}')
+        return response.msg, body
+
+    def _acquire(self, key):
+        with self._lock:
+            connections = self._idle.get(key)
+            return connections.pop() if connections else None
+
+    def _release(self, key, connection):
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def _connect(self, key, timeout):
+        scheme, netloc = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+
+def _split_url(url):
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    return (parts.scheme, parts.netloc), path
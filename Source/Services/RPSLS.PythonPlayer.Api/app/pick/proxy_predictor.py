@@ -1,22 +1,77 @@
 import os
 import json
-import urllib.request
+import msgpack
 
 from .rpsls import RPSLS
-from .rpsls_dto import get_rpsls_dto_json
+from .rpsls_dto import JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, MOVE_CONTENT_TYPE
+from .routing import HashRing
+from .connection_pool import ConnectionPool
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# predictors without content negotiation keep answering JSON
+PREDICTOR_ACCEPT = f'{MOVE_CONTENT_TYPE}, {MSGPACK_CONTENT_TYPE};q=0.9, {JSON_CONTENT_TYPE};q=0.5'
+
+_ring = (None, HashRing())
+
+pool = ConnectionPool(int(os.getenv('PREDICTOR_POOL_SIZE', '5')))
 
 def get_pick_predicted(user_name):
-    queried_url = _get_queried_url(user_name)
-    response = _get_response_from_predictor(queried_url)
-    predicted_pick = RPSLS[response['prediction'].lower()]
-    return get_rpsls_dto_json(predicted_pick)
+    # the same player keeps hitting the same predictor while it answers,
+    # on errors the next predictors of the ring are tried
+    error = None
+    nodes = _get_predictor_ring().get_nodes(user_name)
+    for predictor_url in nodes[:int(os.getenv('PREDICTOR_MAX_ATTEMPTS', '2'))]:
+        try:
+            return _get_response_from_predictor(_get_queried_url(predictor_url, user_name))
+        except (OSError, ValueError) as ex:
+            error = ex
+    raise error or ValueError('No predictor configured')
+
+def _get_predictor_ring():
+    # PREDICTOR_URLS is a comma separated list of predictors, PREDICTOR_URL a single one
+    global _ring
+    predictor_urls = os.getenv('PREDICTOR_URLS') or os.getenv('PREDICTOR_URL') or ''
+    configured_urls, ring = _ring
+    if predictor_urls != configured_urls:
+        ring = HashRing([url.strip() for url in predictor_urls.split(',') if url.strip()])
+        _ring = (predictor_urls, ring)
+    return ring
+
+def get_predictor_urls():
+    return sorted(_get_predictor_ring().nodes)
 
-def _get_queried_url(user_name):
-    predictor_url = os.getenv('PREDICTOR_URL')
+def probe_predictor(predictor_url):
+    # a full prediction for a dedicated player, through the pool so it also
+    # keeps one of its connections alive
+    return _get_response_from_predictor(_get_queried_url(predictor_url, _get_probe_player()))
+
+def warm_up_predictor(predictor_url, connections):
+    return pool.warm(_get_queried_url(predictor_url, _get_probe_player()), connections,
+                     headers={'Accept': PREDICTOR_ACCEPT}, timeout=_get_timeout())
+
+def _get_probe_player():
+    return os.getenv('PREDICTOR_PROBE_PLAYER', 'readiness-probe')
+
+def _get_timeout():
+    return float(os.getenv('PREDICTOR_TIMEOUT_SECONDS', '5'))
+
+def _get_queried_url(predictor_url, user_name):
     return f'{predictor_url}&humanPlayerName={user_name}'
 
-def _get_response_from_predictor(queried_url):    
-    req = urllib.request.urlopen(queried_url)
-    encoding = req.info().get_content_charset('utf-8')
-    data = req.read()
-    return json.loads(data.decode(encoding))
\ No newline at end of file
+def _get_response_from_predictor(queried_url):
+    info, data = pool.get(queried_url, headers={'Accept': PREDICTOR_ACCEPT}, timeout=_get_timeout())
+    return _parse_prediction(info.get_content_type(), info.get_content_charset('utf-8'), data)
+
+def _parse_prediction(content_type, encoding, data):
+    if content_type == MOVE_CONTENT_TYPE:
+        return RPSLS(data[0])
+    if content_type == MSGPACK_CONTENT_TYPE:
+        response = msgpack.unpackb(data)
+    else:
+        response = _json_loads(data.decode(encoding))
+    return RPSLS[response['prediction'].lower()]
@@ -0,0 +1,51 @@
+import hashlib
+import threading
+from bisect import bisect, insort
+
+# Consistent hash ring of predictor endpoints. Every node is placed on the
+# ring vnodes times so players spread evenly, and adding or removing one of
+# N nodes only moves about 1/N of the players to another node.
+class HashRing:
+    def __init__(self, nodes=(), vnodes=100):
+        self.vnodes = vnodes
+        self._ring = []
+        self._nodes = set()
+        self._lock = threading.Lock()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+    @property
+    def nodes(self):
+        return set(self._nodes)
+
+    def add(self, node):
+        with self._lock:
+            if node in self._nodes:
+                return
+            self._nodes.add(node)
+            for replica in range(self.vnodes):
+                insort(self._ring, (self._hash(f'{node}#{replica}'), node))
+
+    def remove(self, node):
+        with self._lock:
+            self._nodes.discard(node)
+            self._ring = [point for point in self._ring if point[1] != node]
+
+    def get_nodes(self, key):
+        """Distinct nodes for key, its owner first and then the failover order"""
+        ring = self._ring
+        if not ring:
+            return []
+        start = bisect(ring, (self._hash(key),))
+        nodes = []
+        for index in range(start, start + len(ring)):
+            node = ring[index % len(ring)][1]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == len(self._nodes):
+                    break
+        return nodes
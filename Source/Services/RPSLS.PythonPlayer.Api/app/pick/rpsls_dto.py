@@ -1,5 +1,37 @@
+import json
 import socket
-from flask import jsonify
+import msgpack
+from flask import Response
 
-def get_rpsls_dto_json(pick):
-    return jsonify(text = pick.name, value = pick.value, player=socket.gethostname(), playerType="python")
\ No newline at end of file
+from .rpsls import RPSLS
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+# a single byte with the pick value
+MOVE_CONTENT_TYPE = 'application/x-rpsls-move'
+SUPPORTED_CONTENT_TYPES = [JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, MOVE_CONTENT_TYPE]
+
+def _get_rpsls_dto(pick):
+    return dict(text = pick.name, value = pick.value, player=socket.gethostname(), playerType="python")
+
+# there is one dto per pick, so every response body is encoded once
+_encoded_dtos = {
+    JSON_CONTENT_TYPE: {pick: json.dumps(_get_rpsls_dto(pick), sort_keys=True, separators=(',', ':')).encode()
+                        for pick in RPSLS},
+    MSGPACK_CONTENT_TYPE: {pick: msgpack.packb(_get_rpsls_dto(pick)) for pick in RPSLS},
+    MOVE_CONTENT_TYPE: {pick: bytes([pick.value]) for pick in RPSLS}
+}
+
+def get_rpsls_dto_response(pick, content_type=JSON_CONTENT_TYPE):
+    return Response(_encoded_dtos[content_type][pick], mimetype=content_type)
+
+def get_rpsls_dtos_response(picks, content_type=JSON_CONTENT_TYPE):
+    # sequences are assembled from the encoded dtos
+    encoded = _encoded_dtos[content_type]
+    if content_type == JSON_CONTENT_TYPE:
+        body = b'[' + b','.join(encoded[pick] for pick in picks) + b']'
+    elif content_type == MSGPACK_CONTENT_TYPE:
+        body = msgpack.Packer().pack_array_header(len(picks)) + b''.join(encoded[pick] for pick in picks)
+    else:
+        body = b''.join(encoded[pick] for pick in picks)
+    return Response(body, mimetype=content_type)
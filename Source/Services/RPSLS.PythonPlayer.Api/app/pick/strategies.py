@@ -1,34 +1,36 @@
 import random
-from flask import jsonify
+import threading
+from collections import OrderedDict
 
 from .rpsls import RPSLS
 
+# Every strategy returns a pick(count=1, user='') function that plays
+# the next count moves of the strategy for that user
+
 # Fixed pick Game Strategy
 def fixed_strategy(pick_value):
     pick_RPSLS=pick_value
-    def pick():
-        return pick_RPSLS
+    def pick(count=1, user=''):
+        return [pick_RPSLS] * count
     return pick
 
 # Random pick Game Strategy
 def random_strategy():
-    def pick():
-        pick_RPSLS = random.choice(list(RPSLS))
-        return pick_RPSLS
+    picks = list(RPSLS)
+    def pick(count=1, user=''):
+        return random.choices(picks, k=count)
     return pick
 
-# Iterative pick Game Strategy
-def iterative_generator(value):
-    while True:
-        yield value
-        value += 1
-        value = value % len(RPSLS)
-
-def iterative_strategy():
-    pick_generator = iterative_generator(0)
-    def pick():
-        pick_RPSLS = RPSLS(next(pick_generator))
-        return pick_RPSLS
+# Iterative pick Game Strategy, each user goes through its own sequence
+def iterative_strategy(max_users=10000):
+    user_values = OrderedDict()
+    lock = threading.Lock()
+    def pick(count=1, user=''):
+        with lock:
+            value = user_values.pop(user, 0)
+            user_values[user] = (value + count) % len(RPSLS)
+            # forget the least recently seen users
+            while len(user_values) > max_users:
+                user_values.popitem(last=False)
+        return [RPSLS((value + offset) % len(RPSLS)) for offset in range(count)]
     return pick
-
-    
\ No newline at end of file
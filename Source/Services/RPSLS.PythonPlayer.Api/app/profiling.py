@@ -0,0 +1,122 @@
+import cProfile
+import functools
+import glob
+import hashlib
+import hmac
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import make_response, request, current_app as app
+
+# RequestProfiler is duplicated in NextMove/profiling.py of RPSLS.Python.Api:
+# the function app and the python player are built and deployed from their
+# own folders and can't share a module, changes must be made to both copies.
+
+# requests carrying '<unix timestamp>:<hex hmac-sha256 of the timestamp>'
+# signed with PROFILING_SECRET are profiled and get a top functions summary
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SUMMARY_HEADER = 'X-Profile-Summary'
+SIGNATURE_MAX_AGE_SECONDS = 300
+
+
+class RequestProfiler:
+    def __init__(self, name, directory, always=False, secret='', slow_ms=0, max_files=50, top_n=10):
+        self.name = name
+        self.directory = directory
+        self.always = always
+        self.secret = secret.encode()
+        self.slow_ms = slow_ms
+        self.max_files = max_files
+        self.top_n = top_n
+        # cProfile can only profile one request at a time
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name):
+        always = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+        secret = os.getenv('PROFILING_SECRET', '')
+        if not always and not secret:
+            return None
+        return cls(name,
+                   os.getenv('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'rpsls-profiles')),
+                   always=always,
+                   secret=secret,
+                   slow_ms=float(os.getenv('PROFILING_SLOW_MS', '0')),
+                   max_files=int(os.getenv('PROFILING_MAX_FILES', '50')),
+                   top_n=int(os.getenv('PROFILING_TOP_N', '10')))
+
+    def run(self, call, headers):
+        selected = self._is_signed(headers.get(PROFILE_HEADER, ''))
+        if not (self.always or selected) or not self._lock.acquire(blocking=False):
+            return call(), None
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            result = profiler.runcall(call)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        finally:
+            self._lock.release()
+
+        summary = None
+        if selected or elapsed_ms >= self.slow_ms:
+            self._dump(profiler, elapsed_ms)
+            if selected:
+                summary = self.summary(profiler)
+        return result, summary
+
+    def summary(self, profiler):
+        stats = pstats.Stats(profiler).sort_stats('cumulative')
+        top = []
+        for key in stats.fcn_list[:self.top_n]:
+            file_name, line, function_name = key
+            cumulative = stats.stats[key][3]
+            top.append(f'{function_name} ({os.path.basename(file_name)}:{line}) {cumulative * 1000:.2f}ms')
+        return '; '.join(top)
+
+    def _is_signed(self, value):
+        if not self.secret or ':' not in value:
+            return False
+        timestamp, signature = value.split(':', 1)
+        try:
+            if abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+                return False
+        except ValueError:
+            return False
+        expected = hmac.new(self.secret, timestamp.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    def _dump(self, profiler, elapsed_ms):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file_name = f'{self.name}-{int(time.time() * 1000)}-{elapsed_ms:.0f}ms-{uuid.uuid4().hex[:8]}.prof'
+            profiler.dump_stats(os.path.join(self.directory, file_name))
+
+            # rotation, only keeps the newest max_files profiles
+            profiles = sorted(glob.glob(os.path.join(self.directory, f'{self.name}-*.prof')),
+                              key=os.path.getmtime)
+            for old_profile in profiles[:-self.max_files]:
+                os.remove(old_profile)
+        except OSError as ex:
+            app.logger.warning('Unable to write request profile: %s', ex)
+
+
+def profiled(view):
+    """Profiles the wrapped view when PROFILING_ENABLED or PROFILING_SECRET
+    are set, otherwise returns it untouched.
+    """
+    profiler = RequestProfiler.from_env('pick')
+    if profiler is None:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response, summary = profiler.run(lambda: make_response(view(*args, **kwargs)), request.headers)
+        if summary:
+            response.headers[PROFILE_SUMMARY_HEADER] = summary
+        return response
+    return wrapper
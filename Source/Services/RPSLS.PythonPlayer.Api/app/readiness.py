@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+import time
+
+from .metrics import Gauge
+from .pick import proxy_predictor
+
+logger = logging.getLogger(__name__)
+
+# Readiness of the pod: a background thread warms up the connections to the
+# predictors and probes them, the readiness endpoint only reads the cached
+# results, so probes add no load whatever the kubelet probe period. The pod is
+# not ready until the warm-up is finished, whatever its outcome: /pick answers
+# with the local strategy when no predictor does, and the predictor is shared
+# by every pod, gating on it would empty the service on predictor outages.
+#
+# With READINESS_REQUIRE_PREDICTOR=true the pod is also only ready while a
+# predictor answered a probe in the last max_age seconds, at startup as later
+# on; the probes are only refreshed every interval in that mode.
+
+class DependencyProbes:
+    def __init__(self, interval=10, max_age=30, warm_connections=2, require_predictor=False):
+        self.interval = interval
+        # older probe results no longer count as answers, the prober is stuck
+        self.max_age = max_age
+        self.warm_connections = warm_connections
+        self.require_predictor = require_predictor
+        self.warmed_up = False
+        self.results = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='dependency-probes', daemon=True)
+
+    @classmethod
+    def from_env(cls):
+        interval = float(os.getenv('READINESS_PROBE_INTERVAL_SECONDS', '10'))
+        return cls(interval,
+                   float(os.getenv('READINESS_PROBE_MAX_AGE_SECONDS', str(interval * 3))),
+                   int(os.getenv('PREDICTOR_WARM_CONNECTIONS', '2')),
+                   os.getenv('READINESS_REQUIRE_PREDICTOR', 'false').lower() == 'true')
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def ready(self):
+        """(ready, details) from the cached probe results"""
+        if not self.warmed_up:
+            return False, 'warming up'
+        if not self.results:
+            return True, 'no predictor configured'
+        details = '; '.join(f"{url.split('?')[0]}: {result['output']}" for url, result in self.results.items())
+        if not self.require_predictor:
+            return True, details
+        # any predictor answering is enough, the ring fails over to it
+        now = time.time()
+        return any(result['passed'] and now - result['timestamp'] <= self.max_age
+                   for result in self.results.values()), details
+
+    def _run(self):
+        self._warm_up()
+        # without READINESS_REQUIRE_PREDICTOR nothing reads fresher results
+        if not self.require_predictor:
+            return
+        while not self._stop.wait(self.interval):
+            self._probe_all()
+
+    def _warm_up(self):
+        try:
+            for url in proxy_predictor.get_predictor_urls():
+                try:
+                    warmed = proxy_predictor.warm_up_predictor(url, self.warm_connections)
+                    logger.info('Warmed up %d connections to %s', warmed, url.split('?')[0])
+                except Exception as ex:
+                    # malformed urls raise ValueError, not OSError
+                    logger.warning('Unable to warm up %s: %r', url.split('?')[0], ex)
+            self._probe_all()
+        finally:
+            # a failed warm-up shows in the probe results, it never blocks readiness forever
+            self.warmed_up = True
+
+    def _probe_all(self):
+        urls = proxy_predictor.get_predictor_urls()
+        results = {}
+        for url in urls:
+            start = time.perf_counter()
+            try:
+                output = f'predicted {proxy_predictor.probe_predictor(url).name}'
+                passed = True
+            except Exception as ex:
+                output, passed = f'{ex!r}', False
+            results[url] = {'passed': passed, 'output': output, 'timestamp': time.time(),
+                            'response_time': time.perf_counter() - start}
+        # swapped at once, readiness never sees a partial refresh
+        self.results = results
+
+
+_probes = None
+
+def get_dependency_probes():
+    global _probes
+    if _probes is None:
+        _probes = DependencyProbes.from_env().start()
+    return _probes
+
+Gauge('python_player_ready', 'Whether the pod reports ready', lambda: int(get_dependency_probes().ready()[0]))
@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+
+import pytest
+
+from stubs import StubConfig, StubServer
+
+SOURCE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "Source"))
+PREDICTOR_DIR = os.path.join(SOURCE_DIR, "Functions", "RPSLS.Python.Api")
+PYTHON_PLAYER_DIR = os.path.join(SOURCE_DIR, "Services", "RPSLS.PythonPlayer.Api")
+
+# NextMove and app are imported straight from the service folders
+for path in (PREDICTOR_DIR, PYTHON_PLAYER_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# tests/reports/benchmarks whatever the directory pytest runs from, as ignored by git
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR",
+                                  os.path.join(os.path.dirname(__file__), "..", "..", "reports", "benchmarks"))
+
+
+@pytest.fixture(scope="session")
+def benchmark_report():
+    """Writes benchmark results as reports/benchmarks/<name>.json"""
+    def write(name, results):
+        os.makedirs(BENCHMARK_RESULTS_DIR, exist_ok=True)
+        with open(os.path.join(BENCHMARK_RESULTS_DIR, f"{name}.json"), "w") as f:
+            json.dump(results, f, indent=2)
+        return results
+    return write
+
+
+@pytest.fixture
+def stub_server():
+    """Starts local game manager or predictor stubs, stopped after the test:
+    stub_server("predictor", latency="uniform:5:20", error_rate=0.1).url
+    """
+    started = []
+
+    def start(kind, **config):
+        server = StubServer(kind, StubConfig(**config)).start()
+        started.append(server)
+        return server
+    yield start
+    for server in started:
+        server.stop()
@@ -0,0 +1,177 @@
+"""Local stand-ins for the game manager games endpoint (GAME_MANAGER_URI)
+and the NextMove predictor (PREDICTOR_URL) with configurable latency,
+errors, slow-drip bodies and history sizes.
+
+usage: python tests/performance/python/stubs.py game-manager|predictor [--port 0]
+           [--latency exponential:20] [--error-rate 0.05] [--drip-chunk 8 --drip-delay-ms 50]
+           [--history-size 20] [--prediction rock]
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+MOVES = ["rock", "paper", "scissors", "lizard", "spock"]
+
+
+@dataclass
+class StubConfig:
+    # fixed:MS, uniform:MIN_MS:MAX_MS or exponential:MEAN_MS
+    latency: str = "fixed:0"
+    # share of requests answered with a 500
+    error_rate: float = 0.0
+    # when set, bodies are sent drip_chunk bytes at a time every drip_delay_ms
+    drip_chunk: int = 0
+    drip_delay_ms: float = 0.0
+    # rounds of history returned by the game manager
+    history_size: int = 20
+    # move always predicted by the predictor, random when not set
+    prediction: Optional[str] = None
+    seed: Optional[int] = None
+
+    def latency_seconds(self, rnd):
+        kind, *params = self.latency.split(":")
+        params = [float(param) for param in params]
+        if kind == "fixed":
+            return params[0] / 1000
+        if kind == "uniform":
+            return rnd.uniform(params[0], params[1]) / 1000
+        if kind == "exponential":
+            return rnd.expovariate(1 / params[0]) / 1000 if params[0] else 0
+        raise ValueError(f"Unknown latency distribution {self.latency}")
+
+
+class StubServer:
+    def __init__(self, kind, config=None, port=0):
+        if kind not in ("game-manager", "predictor"):
+            raise ValueError(f"Unknown stub {kind}")
+        self.kind = kind
+        self.config = config or StubConfig()
+        self.requests = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        # open keep-alive connections, dropped on stop like a stopped service would
+        self._connections = set()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_port
+
+    @property
+    def url(self):
+        """Value for GAME_MANAGER_URI or PREDICTOR_URL"""
+        if self.kind == "game-manager":
+            return f"http://127.0.0.1:{self.port}"
+        return f"http://127.0.0.1:{self.port}/api/challenger/move?code=stub"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _body(self, accept):
+        with self._lock:
+            rnd = self._random
+            if self.kind == "game-manager":
+                size = self.config.history_size
+                data = {"challengerGames": [rnd.randrange(5) for _ in range(size)],
+                        "humanGames": [rnd.randrange(5) for _ in range(size)]}
+                return "application/json", json.dumps(data).encode()
+            prediction = self.config.prediction or rnd.choice(MOVES)
+        if "application/x-rpsls-move" in accept:
+            return "application/x-rpsls-move", bytes([MOVES.index(prediction)])
+        return "application/json", json.dumps({"prediction": prediction}).encode()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub._connections.add(self.connection)
+
+            def finish(self):
+                with stub._lock:
+                    stub._connections.discard(self.connection)
+                super().finish()
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    delay = stub.config.latency_seconds(stub._random)
+                    failed = stub._random.random() < stub.config.error_rate
+                time.sleep(delay)
+
+                if failed:
+                    content_type, body = "text/plain", b"stub failure"
+                    self.send_response(500)
+                else:
+                    content_type, body = stub._body(self.headers.get("Accept", ""))
+                    self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self._write(body)
+
+            def _write(self, body):
+                chunk = stub.config.drip_chunk
+                if not chunk:
+                    self.wfile.write(body)
+                    return
+                for start in range(0, len(body), chunk):
+                    self.wfile.write(body[start:start + chunk])
+                    self.wfile.flush()
+                    time.sleep(stub.config.drip_delay_ms / 1000)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a game manager or predictor stub")
+    parser.add_argument("kind", choices=["game-manager", "predictor"])
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drip-chunk", type=int, default=0)
+    parser.add_argument("--drip-delay-ms", type=float, default=0.0)
+    parser.add_argument("--history-size", type=int, default=20)
+    parser.add_argument("--prediction", choices=MOVES)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.error_rate, args.drip_chunk, args.drip_delay_ms,
+                        args.history_size, args.prediction)
+    stub = StubServer(args.kind, config, args.port).start()
+    print(f"{args.kind} stub listening, url: {stub.url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+import app.pick as pick
+from app import app as flask_app
+from app.pick.admission import AdmissionController, RateLimiter, shed_requests
+from app.pick.rpsls import RPSLS
+
+
+@pytest.mark.performance
+def test_token_bucket_per_client():
+    limiter = RateLimiter(rate=1, burst=2)
+    assert [limiter.allow("john", now=0) for _ in range(3)] == [True, True, False]
+    assert limiter.allow("jane", now=0)
+    assert not limiter.allow("john", now=0.5)
+    assert limiter.allow("john", now=1.5)
+
+
+@pytest.mark.performance
+def test_admission_queue_is_bounded():
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=0.01)
+    full = shed_requests.value("queue_full")
+    assert admission.try_acquire()
+    assert not admission.try_acquire()
+    assert shed_requests.value("queue_full") == full + 1
+    admission.release()
+    assert admission.try_acquire()
+    admission.release()
+
+
+@pytest.mark.performance
+def test_overloaded_pick_sheds_to_local_strategy(monkeypatch):
+    monkeypatch.setenv("PICK_STRATEGY", "rock")
+    monkeypatch.setattr(pick, "admission", AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01))
+    release = threading.Event()
+
+    def slow_predictor(username):
+        release.wait(5)
+        return RPSLS.spock
+
+    monkeypatch.setattr(pick, "get_pick_predicted", slow_predictor)
+    client = flask_app.test_client()
+    timeout = shed_requests.value("queue_timeout")
+
+    slow = threading.Thread(target=lambda: client.get("/pick?username=john"))
+    slow.start()
+    while pick.admission.in_flight == 0:
+        time.sleep(0.001)
+
+    start = time.perf_counter()
+    response = client.get("/pick?username=jane")
+    assert time.perf_counter() - start < 1
+    assert response.get_json()["text"] == "rock"
+    assert shed_requests.value("queue_timeout") == timeout + 1
+
+    release.set()
+    slow.join()
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'pick_shed_requests_total{reason="queue_timeout"}' in metrics
+    assert "pick_queue_wait_seconds_count" in metrics
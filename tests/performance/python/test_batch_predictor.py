@@ -0,0 +1,90 @@
+import random
+import time
+import tracemalloc
+
+import pytest
+
+from NextMove.next_move import INTERNAL_MOVES_ENCODING, _predict_next_move
+from NextMove.batch_predictor import MAX_CHUNK_CELLS, predict_next_moves
+
+# peak memory allowed for long histories, the chunks are bounded by MAX_CHUNK_CELLS
+LONG_HISTORY_PEAK_MB = 64
+
+
+def _random_games(n_players, min_length, max_length, seed):
+    rnd = random.Random(seed)
+    games = []
+    for _ in range(n_players):
+        length = rnd.randint(min_length, max_length)
+        challenger = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(length))
+        if rnd.random() < 0.5:
+            # stereotyped opponent cycling through a short pattern
+            pattern = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(rnd.randint(1, 4)))
+            human = (pattern * length)[:length]
+        else:
+            human = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(length))
+        games.append((challenger, human))
+    return games
+
+
+@pytest.mark.performance
+def test_batch_matches_scalar_prediction():
+    games = _random_games(400, 2, 60, seed=26)
+    games += [("RRRRRRRRRR", "PPPPPPPPPP"), ("RPSVL" * 10, "LVSPR" * 10), ("RPS", "RP")]
+    assert predict_next_moves(games, chunk_size=64) == [_predict_next_move(*game) for game in games]
+
+
+@pytest.mark.performance
+def test_batch_matches_scalar_prediction_for_long_histories():
+    games = _random_games(12, 300, 900, seed=260)
+    assert predict_next_moves(games) == [_predict_next_move(*game) for game in games]
+
+
+@pytest.mark.performance
+def test_batch_random_for_short_histories():
+    random.seed(1)
+    expected = [_predict_next_move("", ""), _predict_next_move("R", "P")]
+    random.seed(1)
+    assert predict_next_moves([("", ""), ("R", "P")]) == expected
+
+
+@pytest.mark.performance
+def test_batch_players_per_second(benchmark_report):
+    results = []
+    for n_players in (10, 100, 1000):
+        games = _random_games(n_players, 20, 40, seed=n_players)
+
+        start = time.perf_counter()
+        for game in games:
+            _predict_next_move(*game)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predict_next_moves(games)
+        batch = time.perf_counter() - start
+
+        results.append({"players": n_players,
+                        "scalar_players_per_second": n_players / scalar,
+                        "batch_players_per_second": n_players / batch})
+    benchmark_report("batch_predictor", results)
+
+
+@pytest.mark.performance
+def test_batch_long_histories_memory(benchmark_report):
+    results = []
+    for n_players, rounds in ((256, 400), (50, 1000)):
+        games = _random_games(n_players, rounds, rounds, seed=rounds)
+
+        tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            predict_next_moves(games)
+            elapsed = time.perf_counter() - start
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+        results.append({"players": n_players, "rounds": rounds, "max_chunk_cells": MAX_CHUNK_CELLS,
+                        "peak_mb": peak_mb, "batch_players_per_second": n_players / elapsed})
+        assert peak_mb < LONG_HISTORY_PEAK_MB
+    benchmark_report("batch_predictor_long_histories", results)
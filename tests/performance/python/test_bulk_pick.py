@@ -0,0 +1,60 @@
+import time
+
+import msgpack
+import pytest
+
+from app import app as flask_app
+from app.pick.strategies import iterative_strategy, random_strategy
+from app.pick.rpsls import RPSLS
+
+
+@pytest.mark.performance
+def test_iterative_sequence_is_kept_per_user():
+    pick = iterative_strategy()
+    assert pick(3, "john") == [RPSLS.rock, RPSLS.paper, RPSLS.scissors]
+    assert pick(1, "jane") == [RPSLS.rock]
+    assert pick(3, "john") == [RPSLS.lizard, RPSLS.spock, RPSLS.rock]
+
+
+@pytest.mark.performance
+def test_bulk_pick_in_every_encoding(monkeypatch):
+    monkeypatch.setenv("PICK_STRATEGY", "iterative")
+    client = flask_app.test_client()
+
+    picks = client.get("/pick?count=3&username=bulk").get_json()
+    assert [p["value"] for p in picks] == [0, 1, 2]
+    assert client.get("/pick?username=bulk&count=1", headers={"Accept": "application/x-rpsls-move"}).data == b"\x03"
+    packed = client.get("/pick?username=bulk&count=2", headers={"Accept": "application/msgpack"}).data
+    assert [p["text"] for p in msgpack.unpackb(packed)] == ["spock", "rock"]
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("count", ["0", "abc", "100000"])
+def test_bulk_pick_rejects_invalid_count(count):
+    assert flask_app.test_client().get(f"/pick?count={count}").status_code == 400
+
+
+@pytest.mark.performance
+def test_bulk_pick_moves_per_second(monkeypatch, benchmark_report):
+    monkeypatch.setenv("PICK_STRATEGY", "random")
+    client = flask_app.test_client()
+    moves = 2000
+
+    start = time.perf_counter()
+    for _ in range(moves):
+        client.get("/pick")
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(moves // 100):
+        client.get("/pick?count=100")
+    bulk = time.perf_counter() - start
+
+    random_pick = random_strategy()
+    start = time.perf_counter()
+    random_pick(moves)
+    generation = time.perf_counter() - start
+
+    benchmark_report("bulk_pick", {"single_pick_moves_per_second": moves / single,
+                                   "bulk_pick_100_moves_per_second": moves / bulk,
+                                   "random_bulk_generation_moves_per_second": moves / generation})
@@ -0,0 +1,205 @@
+import random
+import statistics
+import time
+
+import pytest
+
+from NextMove import batch_predictor, ensemble as ensemble_module, shadow
+from NextMove.ensemble import Ensemble, Pruning, Strategy
+from NextMove.next_move import INTERNAL_MOVES_ENCODING, _zip_moves
+
+ROUNDS = 80
+REPEATS = 3
+SEEDS = (7, 8, 9)
+# history and repetitions of the strategy cost measures
+COST_ROUNDS = 80
+COST_REPEATS = 50
+
+
+class _RecordingStrategy(Strategy):
+    name = "recording"
+
+    def __init__(self):
+        self.seen = 0
+
+    def update(self, history, N):
+        self.seen = N
+
+    def predict(self, history, N):
+        return [history[N-1][1]]
+
+
+def _reference_best_next_moves(hist):
+    # frozen copy of the predictor strategies before the ensemble refactor
+    N = len(hist)
+    cand_m = cand_o = cand_b = range(N-1)
+    for l in range(1, min(N, 20)):
+        ref = hist[N-l]
+        cand_m = [c for c in cand_m if c >= l and hist[c-l+1][0] == ref[0]] or cand_m[-1:]
+        cand_o = [c for c in cand_o if c >= l and hist[c-l+1][1] == ref[1]] or cand_o[-1:]
+        cand_b = [c for c in cand_b if c >= l and hist[c-l+1] == ref] or cand_b[-1:]
+    freq_m, freq_o = [0]*5, [0]*5
+    for m in hist:
+        freq_m[m[0]] += 1
+        freq_o[m[1]] += 1
+    last_2_moves = [j for i in hist[:-3:-1] for j in i]
+    return (last_2_moves +
+            [hist[cand_m[-1]+1][0], hist[cand_o[-1]+1][1], hist[cand_b[-1]+1][0], hist[cand_b[-1]+1][1],
+             freq_m.index(max(freq_m)), freq_o.index(max(freq_o)), 0])
+
+
+def _reference_predict(history):
+    # frozen copy of the scoring of _predict_next_move before the ensemble refactor
+    pred_hist = [_reference_best_next_moves(history[:i]) for i in range(2, len(history)+1)]
+    n_pred = len(pred_hist[0])
+    scores = [[0]*5 for i in range(n_pred)]
+    for pred, real in zip(pred_hist[:-1], history[2:]):
+        for i in range(n_pred):
+            scores[i][(real[1]-pred[i]+1) % 5] += 1
+            scores[i][(real[1]-pred[i]+3) % 5] += 1
+            scores[i][(real[1]-pred[i]+2) % 5] -= 1
+            scores[i][(real[1]-pred[i]+4) % 5] -= 1
+    best_scores = [list(max(enumerate(s), key=lambda x: x[1])) for s in scores]
+    best_scores[-1][1] *= 1.001
+    if best_scores[-1][1] < 0.4*len(history):
+        best_scores[-1][1] *= 1.4
+    strat, (shift, _) = max(enumerate(best_scores), key=lambda x: x[1][1])
+    return (pred_hist[-1][strat]+shift) % 5
+
+
+def _cycle(history, rnd):
+    return len(history) % 5
+
+
+def _biased(history, rnd):
+    return 0 if rnd.random() < 0.6 else rnd.randrange(5)
+
+
+def _beat_last(history, rnd):
+    # plays a move beating the last challenger move
+    return (history[-1][0] + 1) % 5 if history else 0
+
+
+def _random(history, rnd):
+    return rnd.randrange(5)
+
+
+OPPONENTS = {"cycle": _cycle, "biased": _biased, "beat_last": _beat_last, "random": _random}
+
+
+def _play(ensemble, opponent, seed):
+    rnd = random.Random(seed)
+    history, wins = [], 0
+    for _ in range(ROUNDS):
+        move = ensemble.predict(history) if len(history) >= 2 else rnd.randrange(5)
+        human = opponent(history, rnd)
+        wins += (move - human) % 5 in (1, 3)
+        history.append((move, human))
+    return wins / ROUNDS
+
+
+@pytest.mark.performance
+def test_registered_strategies_are_plugged_in():
+    strategy = _RecordingStrategy()
+    ensemble = Ensemble(factories=[lambda: strategy])
+    move = ensemble.predict([(0, 1), (2, 1), (3, 1), (4, 1)])
+    assert strategy.seen == 4
+    # the opponent always plays paper, repeating it shifted to scissors wins
+    assert move == 2
+
+
+@pytest.mark.performance
+def test_ensemble_without_pruning_matches_the_original_predictor():
+    rnd = random.Random(37)
+    for _ in range(200):
+        n = rnd.randint(2, 60)
+        challenger = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(n))
+        human = "".join(rnd.choice(INTERNAL_MOVES_ENCODING[:rnd.randint(1, 5)]) for _ in range(n))
+        history = _zip_moves(challenger, human)
+        assert Ensemble().predict(history) == _reference_predict(history)
+
+
+@pytest.mark.performance
+def test_batch_engine_refuses_registered_strategies(monkeypatch, caplog):
+    monkeypatch.setattr(ensemble_module, "STRATEGIES", list(ensemble_module.STRATEGIES))
+    monkeypatch.setattr(batch_predictor, "STRATEGIES", ensemble_module.STRATEGIES)
+    ensemble_module.register_strategy(_RecordingStrategy)
+    with pytest.raises(ValueError):
+        batch_predictor.predict_next_moves([("RPSVL", "RRRRR")])
+
+    monkeypatch.setattr(shadow, "_configured", False)
+    monkeypatch.setattr(shadow, "_evaluator", None)
+    monkeypatch.setenv("SHADOW_ENGINE", "batch")
+    assert shadow.get_shadow_evaluator() is None
+    assert "only implements the default strategies" in caplog.text
+
+
+def _best_process_time(call):
+    # best of REPEATS runs, process time is noisy on shared machines
+    times = []
+    for _ in range(REPEATS):
+        start = time.process_time()
+        result = call()
+        times.append(time.process_time() - start)
+    return min(times), result
+
+
+@pytest.mark.performance
+def test_declared_strategy_costs(benchmark_report):
+    rnd = random.Random(38)
+    history = [(rnd.randrange(5), rnd.randrange(5)) for _ in range(COST_ROUNDS)]
+
+    def run(factory):
+        strategy = factory()
+        for N in range(1, COST_ROUNDS + 1):
+            strategy.update(history, N)
+            if N >= 2:
+                strategy.predict(history, N)
+        return strategy
+
+    results = {}
+    for factory in list(ensemble_module.STRATEGIES) + [ensemble_module.Constant]:
+        seconds, strategy = _best_process_time(lambda: [run(factory) for _ in range(COST_REPEATS)][-1])
+        results[strategy.name] = {"declared_cost": strategy.cost,
+                                  "measured_us": seconds / COST_REPEATS / (COST_ROUNDS - 1) * 1e6}
+    benchmark_report("strategy_costs", results)
+
+    # declared costs are relative to the cheapest strategy within a factor of 3 of the measures
+    reference = results["last_moves"]
+    for name, result in results.items():
+        declared = result["declared_cost"] / reference["declared_cost"]
+        measured = result["measured_us"] / reference["measured_us"]
+        assert declared / 3 <= measured <= declared * 3, (name, declared, measured)
+
+
+@pytest.mark.performance
+def test_pruning_cpu_saved_vs_accuracy(benchmark_report):
+    results = {}
+    modes = (("full", None), ("pruned", Pruning()))
+    for name, opponent in OPPONENTS.items():
+        report = {mode: {"cpu_seconds": float("inf")} for mode, _ in modes}
+        # full and pruned runs alternate, the best of REPEATS is kept
+        for _ in range(REPEATS):
+            for mode, pruning in modes:
+                ensemble = Ensemble(pruning=pruning)
+                start = time.process_time()
+                win_rate = statistics.mean(_play(ensemble, opponent, seed) for seed in SEEDS)
+                cpu_seconds = time.process_time() - start
+                report[mode] = {"win_rate": win_rate,
+                                "cpu_seconds": min(cpu_seconds, report[mode]["cpu_seconds"]),
+                                "evaluated_cost_ratio": ensemble.evaluated_cost / ensemble.total_cost}
+        # measured with time.process_time, the declared costs only estimate it
+        report["cpu_saved"] = 1 - report["pruned"]["cpu_seconds"] / report["full"]["cpu_seconds"]
+        report["estimated_cpu_saved"] = 1 - report["pruned"]["evaluated_cost_ratio"]
+        report["accuracy_lost"] = report["full"]["win_rate"] - report["pruned"]["win_rate"]
+        results[name] = report
+    benchmark_report("ensemble_pruning", results)
+
+    # Pruning doesn't pay off yet. The scoring of the proposals is not pruned,
+    # so the measured cpu_saved is far below the estimate from the declared
+    # costs: 10-20% against the cycling opponent, a few percent or a loss
+    # (down to -20% against beat_last) for the others. PREDICTOR_PRUNING stays
+    # off by default, this only guards against the bookkeeping costing even more.
+    for name, report in results.items():
+        assert report["pruned"]["cpu_seconds"] <= report["full"]["cpu_seconds"] * 1.35, name
+        assert report["accuracy_lost"] <= 0.05, name
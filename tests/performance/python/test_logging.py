@@ -0,0 +1,126 @@
+import logging
+import time
+
+import pytest
+
+from NextMove import sampled_logging
+from app import log_pipeline
+from app.log_pipeline import SamplingFilter, start_queue_logging
+
+RECORDS = 20000
+# records and write latency of the blocking stream benchmark
+BLOCKING_RECORDS = 2000
+BLOCKING_WRITE_MS = 0.2
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def _logger(name, handler, rate=1.0, sampling_filter=SamplingFilter):
+    logger = logging.getLogger(f"benchmark.{name}")
+    logger.handlers = [handler]
+    logger.filters = []
+    logger.addFilter(sampling_filter(rate))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+# SamplingFilter and get_request_logger are duplicated in both services
+LOGGING_MODULES = pytest.mark.parametrize("logging_module", [sampled_logging, log_pipeline],
+                                          ids=["next_move", "pick"])
+
+
+@pytest.mark.performance
+@LOGGING_MODULES
+def test_sampling_always_keeps_errors(logging_module):
+    handler = _ListHandler()
+    logger = _logger(f"sampling.{logging_module.__name__}", handler, 0, logging_module.SamplingFilter)
+    logger.info("dropped %s", "pick")
+    logger.error("kept %s", "error")
+    assert handler.messages == ["kept error"]
+
+
+@pytest.mark.performance
+@LOGGING_MODULES
+def test_sampling_rate(logging_module):
+    handler = _ListHandler()
+    logger = _logger(f"rate.{logging_module.__name__}", handler, 0.1, logging_module.SamplingFilter)
+    for _ in range(10000):
+        logger.info("sampled")
+    assert 700 < len(handler.messages) < 1300
+
+
+@pytest.mark.performance
+@LOGGING_MODULES
+def test_request_logger_is_sampled_once(monkeypatch, logging_module):
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0.5")
+    name = f"request.{logging_module.__name__}"
+    logger = logging_module.get_request_logger(name)
+    assert logging_module.get_request_logger(name) is logger
+    assert [log_filter.rate for log_filter in logger.filters] == [0.5]
+
+
+@pytest.mark.performance
+def test_queue_logging_formats_on_listener():
+    handler = _ListHandler()
+    logger = _logger("queue", handler)
+    listener = start_queue_logging(logger, [handler])
+    logger.info("Against user [%s] predictor played %s", "john", "spock")
+    listener.stop()
+    assert handler.messages == ["Against user [john] predictor played spock"]
+
+
+class _BlockingStream:
+    """Stream whose writes block for write_ms, like gunicorn's stderr pipe
+    when its reader falls behind under load"""
+
+    def __init__(self, write_ms):
+        self.write_seconds = write_ms / 1000
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.write_seconds)
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def _request_thread_seconds(logger, records):
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info("Against user [%s] predictor played %s", f"user{i}", "spock")
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+def test_logging_throughput(benchmark_report, tmp_path):
+    # request thread throughput, the listener drains the queue in the background
+    handlers = {
+        "file": (RECORDS, lambda name: logging.FileHandler(tmp_path / f"{name}.log")),
+        "blocking_stream": (BLOCKING_RECORDS, lambda name: logging.StreamHandler(_BlockingStream(BLOCKING_WRITE_MS))),
+    }
+    results = {}
+    for handler_name, (records, make_handler) in handlers.items():
+        for name, rate, queued in [("sync", 1.0, False), ("queued", 1.0, True), ("queued_sampled_10pct", 0.1, True)]:
+            handler = make_handler(f"{handler_name}_{name}")
+            handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+            logger = _logger(f"{handler_name}.{name}", handler, rate)
+            listener = start_queue_logging(logger, [handler]) if queued else None
+            elapsed = _request_thread_seconds(logger, records)
+            if listener:
+                listener.stop()
+            handler.close()
+            results[f"{handler_name}_{name}_records_per_second"] = records / elapsed
+    benchmark_report("logging", results)
+
+    # with a realistic write cost the request thread no longer waits for the writes
+    assert results["blocking_stream_queued_records_per_second"] > \
+        5 * results["blocking_stream_sync_records_per_second"]
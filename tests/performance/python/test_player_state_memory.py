@@ -0,0 +1,109 @@
+import os
+import random
+import tracemalloc
+from array import array
+
+import numpy as np
+import pytest
+
+from NextMove.ensemble import Ensemble
+from NextMove.next_move import INTERNAL_MOVES_ENCODING, _zip_moves
+
+SAMPLE_PLAYERS = 2000
+PROJECTED_PLAYERS = [10_000, 100_000, 1_000_000]
+HISTORY_ROUNDS = [10, 50, 200]
+# players whose state must fit in the budget, with histories of BUDGET_ROUNDS
+TARGET_PLAYERS = int(os.getenv("PLAYER_STATE_TARGET_PLAYERS", "100000"))
+BUDGET_ROUNDS = int(os.getenv("PLAYER_STATE_HISTORY_ROUNDS", "50"))
+# memory of a python player pod, the chart sets no memory limit so the budget is kept here
+MEMORY_LIMIT = os.getenv("PLAYER_STATE_MEMORY_LIMIT", "512Mi")
+# share of the pod memory available to player state
+BUDGET_SHARE = float(os.getenv("PLAYER_STATE_MEMORY_SHARE", "0.5"))
+
+UNITS = {"Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "K": 10**3, "M": 10**6, "G": 10**9}
+
+
+def _memory_limit_bytes(limit):
+    """Bytes of a kubernetes memory quantity such as 512Mi"""
+    for unit, factor in UNITS.items():
+        if limit.endswith(unit):
+            return int(float(limit[:-len(unit)]) * factor)
+    return int(limit)
+
+
+def _random_moves(rnd, rounds):
+    return [rnd.randrange(5) for _ in range(rounds)], [rnd.randrange(5) for _ in range(rounds)]
+
+
+def _strings(challenger, human):
+    return ("".join(INTERNAL_MOVES_ENCODING[move] for move in challenger),
+            "".join(INTERNAL_MOVES_ENCODING[move] for move in human))
+
+
+def _pred_hist(history):
+    # proposals of every strategy for each prefix, as the pred_hist list of the predictor
+    strategies = [factory() for factory in Ensemble().factories]
+    pred_hist = []
+    for N in range(1, len(history) + 1):
+        for strategy in strategies:
+            strategy.update(history, N)
+        if N >= 2:
+            pred_hist.append([move for strategy in strategies for move in strategy.predict(history, N)] + [0])
+    return pred_hist
+
+
+# state kept for a player, built from its challenger and human moves
+REPRESENTATIONS = {
+    # current representations
+    "strings": _strings,
+    "zip_moves_tuples": lambda challenger, human: _zip_moves(*_strings(challenger, human)),
+    "pred_hist_lists": lambda challenger, human: _pred_hist(_zip_moves(*_strings(challenger, human))),
+    # compact representations
+    "bytes_pair": lambda challenger, human: (bytes(challenger), bytes(human)),
+    "packed_round_bytes": lambda challenger, human: bytes(5 * c + h for c, h in zip(challenger, human)),
+    "array_int8": lambda challenger, human: array("b", challenger + human),
+    "numpy_int8": lambda challenger, human: np.array([challenger, human], dtype=np.int8),
+}
+# pred_hist is quadratic in the rounds, a smaller sample is enough
+SAMPLE_SIZES = {"pred_hist_lists": 200}
+
+
+def _bytes_per_player(name, rounds):
+    build = REPRESENTATIONS[name]
+    players = SAMPLE_SIZES.get(name, SAMPLE_PLAYERS)
+    rnd = random.Random(rounds)
+    games = [_random_moves(rnd, rounds) for _ in range(players)]
+    names = [f"player{i}" for i in range(players)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        # a dict entry per player, as a cache keyed by player name would hold it
+        states = {player: build(*game) for player, game in zip(names, games)}
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(states) == players
+    return used / players
+
+
+@pytest.mark.performance
+def test_player_state_memory_footprint(benchmark_report):
+    budget = _memory_limit_bytes(MEMORY_LIMIT) * BUDGET_SHARE
+    results = {"memory_limit": MEMORY_LIMIT, "memory_budget_bytes": budget, "target_players": TARGET_PLAYERS,
+               "budget_rounds": BUDGET_ROUNDS, "representations": {}}
+    for name in REPRESENTATIONS:
+        per_rounds = {}
+        for rounds in sorted(set(HISTORY_ROUNDS + [BUDGET_ROUNDS])):
+            per_player = _bytes_per_player(name, rounds)
+            per_rounds[rounds] = {
+                "bytes_per_player": per_player,
+                "projected_mb": {players: per_player * players / 2**20 for players in PROJECTED_PLAYERS},
+                "players_in_budget": int(budget // per_player),
+            }
+        results["representations"][name] = per_rounds
+    benchmark_report("player_state_memory", results)
+
+    # the history kept per player today must fit the budget for the target population
+    strings = results["representations"]["strings"][BUDGET_ROUNDS]
+    assert strings["bytes_per_player"] * TARGET_PLAYERS <= budget, \
+        f"{TARGET_PLAYERS} players need {strings['bytes_per_player'] * TARGET_PLAYERS / 2**20:.0f}MB"
@@ -0,0 +1,93 @@
+import logging
+import random
+import time
+
+import azure.functions as func
+import pytest
+
+import NextMove
+from NextMove import next_move
+
+from NextMove.next_move import INTERNAL_MOVES_ENCODING, _predict_next_move
+from NextMove.prediction_memo import PredictionMemo
+
+
+def _population(n_players, seed):
+    """Bots cycling short patterns and new humans with a few rounds played"""
+    rnd = random.Random(seed)
+    patterns = ["R", "P", "RP", "RPS", "RPSVL", "SV"]
+    games = []
+    for _ in range(n_players):
+        if rnd.random() < 0.7:
+            length = rnd.randint(2, 15)
+            human = (rnd.choice(patterns) * length)[:length]
+            challenger = (rnd.choice(patterns) * length)[:length]
+        else:
+            length = rnd.randint(2, 5)
+            human = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(length))
+            challenger = "".join(rnd.choice(INTERNAL_MOVES_ENCODING) for _ in range(length))
+        games.append((challenger, human))
+    return games
+
+
+@pytest.mark.performance
+def test_memo_returns_scalar_predictions():
+    memo = PredictionMemo(max_size=100, max_rounds=20)
+    games = _population(500, seed=33)
+    assert [memo.predict(_predict_next_move, *game) for game in games] == \
+        [_predict_next_move(*game) for game in games]
+    assert memo.stats()["hits"] > 0
+    assert memo.stats()["size"] <= 100
+
+
+@pytest.mark.performance
+def test_memo_evicts_least_recent_and_bypasses_long_histories():
+    calls = []
+
+    def predict(challenger_moves, human_moves):
+        calls.append((challenger_moves, human_moves))
+        return "R"
+
+    memo = PredictionMemo(max_size=2, max_rounds=3)
+    for game in [("RR", "PP"), ("SS", "PP"), ("RR", "PP"), ("VV", "PP"), ("SS", "PP")]:
+        memo.predict(predict, *game)
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["evictions"] == 2
+
+    memo.predict(predict, "RRRR", "PPPP")
+    memo.predict(predict, "RRRR", "PPPP")
+    memo.predict(predict, "R", "P")
+    assert memo.stats()["bypassed"] == 3
+
+
+@pytest.mark.performance
+def test_memo_throughput_on_synthetic_population(benchmark_report):
+    games = _population(20000, seed=1)
+
+    start = time.perf_counter()
+    for game in games:
+        _predict_next_move(*game)
+    direct = time.perf_counter() - start
+
+    memo = PredictionMemo(max_size=10000, max_rounds=20)
+    start = time.perf_counter()
+    for game in games:
+        memo.predict(_predict_next_move, *game)
+    memoized = time.perf_counter() - start
+
+    stats = memo.stats()
+    benchmark_report("prediction_memo", {"players": len(games),
+                                         "direct_predictions_per_second": len(games) / direct,
+                                         "memo_predictions_per_second": len(games) / memoized,
+                                         **stats})
+    assert stats["hit_rate"] > 0.5
+
+
+@pytest.mark.performance
+def test_memo_stats_are_logged_with_sampled_request_logs(monkeypatch, caplog):
+    monkeypatch.setattr(next_move, "_get_player_games", lambda player_name: ("RPSVL", "RRRRR"))
+    req = func.HttpRequest("GET", "/api/challenger/move", params={"humanPlayerName": "john"}, body=b"")
+    with caplog.at_level(logging.INFO, logger="NextMove"):
+        assert NextMove.main(req).status_code == 200
+    assert any(record.name == "NextMove" and "prediction memo stats: {'size'" in record.getMessage()
+               for record in caplog.records)
@@ -0,0 +1,101 @@
+import hashlib
+import hmac
+import os
+import time
+
+import azure.functions as func
+import pytest
+from flask import Flask
+
+from NextMove import profiling as next_move_profiling
+from app import profiling as pick_profiling
+
+# RequestProfiler is duplicated in both services, every test runs against both copies
+PROFILING_MODULES = pytest.mark.parametrize("profiling", [next_move_profiling, pick_profiling],
+                                            ids=["next_move", "pick"])
+
+
+def _signed_header(secret, timestamp=None):
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    return f"{timestamp}:{hmac.new(secret.encode(), timestamp.encode(), hashlib.sha256).hexdigest()}"
+
+
+def _next_move(req):
+    return func.HttpResponse(req.params.get("humanPlayerName", ""))
+
+
+def _next_move_client(profiling):
+    main = profiling.profiled(_next_move)
+
+    def get(headers=None):
+        req = func.HttpRequest("GET", "/api/challenger/move", params={"humanPlayerName": "john"},
+                               headers=headers or {}, body=b"")
+        response = main(req)
+        return response.get_body(), response.headers
+    return get
+
+
+def _pick_client(profiling):
+    flask_app = Flask(__name__)
+    flask_app.add_url_rule("/pick", "pick", view_func=profiling.profiled(lambda: "john"))
+    client = flask_app.test_client()
+
+    def get(headers=None):
+        response = client.get("/pick", headers=headers or {})
+        return response.data, response.headers
+    return get
+
+
+CLIENTS = {next_move_profiling: _next_move_client, pick_profiling: _pick_client}
+
+
+@pytest.mark.performance
+@PROFILING_MODULES
+def test_profiling_disabled_keeps_function(monkeypatch, profiling):
+    monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+    monkeypatch.delenv("PROFILING_SECRET", raising=False)
+    assert profiling.profiled(_next_move) is _next_move
+
+
+@pytest.mark.performance
+@PROFILING_MODULES
+def test_signature_check(profiling):
+    profiler = profiling.RequestProfiler("test", "unused", secret="secret")
+    assert profiler._is_signed(_signed_header("secret"))
+    assert not profiler._is_signed(_signed_header("other"))
+    assert not profiler._is_signed(_signed_header("secret", time.time() - profiling.SIGNATURE_MAX_AGE_SECONDS - 10))
+    assert not profiler._is_signed("1:bad")
+    assert not profiler._is_signed("not-a-timestamp:bad")
+    assert not profiling.RequestProfiler("test", "unused")._is_signed(_signed_header(""))
+
+
+@pytest.mark.performance
+@PROFILING_MODULES
+def test_slow_requests_are_written_with_rotation(monkeypatch, tmp_path, profiling):
+    monkeypatch.setenv("PROFILING_ENABLED", "true")
+    monkeypatch.delenv("PROFILING_SECRET", raising=False)
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILING_MAX_FILES", "3")
+    get = CLIENTS[profiling](profiling)
+
+    for _ in range(5):
+        body, headers = get()
+    assert body == b"john"
+    assert profiling.PROFILE_SUMMARY_HEADER not in headers
+    assert len(os.listdir(tmp_path)) == 3
+
+
+@pytest.mark.performance
+@PROFILING_MODULES
+def test_signed_request_returns_summary(monkeypatch, tmp_path, profiling):
+    monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+    monkeypatch.setenv("PROFILING_SECRET", "secret")
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+    get = CLIENTS[profiling](profiling)
+
+    assert profiling.PROFILE_SUMMARY_HEADER not in get()[1]
+    assert profiling.PROFILE_SUMMARY_HEADER not in get({profiling.PROFILE_HEADER: "1:bad"})[1]
+    body, headers = get({profiling.PROFILE_HEADER: _signed_header("secret")})
+    assert body == b"john"
+    assert "ms" in headers[profiling.PROFILE_SUMMARY_HEADER]
+    assert len(os.listdir(tmp_path)) == 1
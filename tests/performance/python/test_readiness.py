@@ -0,0 +1,150 @@
+import time
+
+import pytest
+
+import app as python_player
+from app import readiness
+from app.pick import proxy_predictor
+from app.pick.connection_pool import ConnectionPool
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def stop_app_probes():
+    # the probes started with the app would also probe the stubs of these tests
+    readiness.get_dependency_probes().stop()
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    def start(**config):
+        dependency_probes = readiness.DependencyProbes(**config).start()
+        monkeypatch.setattr(readiness, "_probes", dependency_probes)
+        started.append(dependency_probes)
+        return dependency_probes
+    started = []
+    yield start
+    for dependency_probes in started:
+        dependency_probes.stop()
+
+
+@pytest.mark.performance
+def test_not_ready_until_predictor_connections_are_warm(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor", latency="fixed:200", prediction="spock")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    client = python_player.app.test_client()
+
+    dependency_probes = probes(interval=60, warm_connections=3)
+    assert client.get("/ready").status_code == 503
+    assert client.get("/live").status_code == 200
+
+    _wait_for(lambda: dependency_probes.warmed_up)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert "predicted spock" in response.get_data(as_text=True)
+    assert proxy_predictor.pool.idle_connections() >= 3
+
+
+@pytest.mark.performance
+def test_readiness_serves_cached_probe_results(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    client = python_player.app.test_client()
+    dependency_probes = probes(interval=60, warm_connections=1, require_predictor=True)
+    _wait_for(lambda: dependency_probes.warmed_up)
+
+    requests = predictor.requests
+    for _ in range(50):
+        assert client.get("/ready").status_code == 200
+    assert predictor.requests == requests
+
+
+@pytest.mark.performance
+def test_failing_predictor_only_gates_readiness_when_required(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor", error_rate=1.0)
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    client = python_player.app.test_client()
+
+    dependency_probes = probes(interval=60)
+    _wait_for(lambda: dependency_probes.warmed_up)
+    # picks are answered by the local strategy
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert "500" in response.get_data(as_text=True)
+
+    dependency_probes.require_predictor = True
+    assert client.get("/ready").status_code == 503
+
+
+@pytest.mark.performance
+def test_default_readiness_does_not_refresh_probes(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    dependency_probes = probes(interval=0.01, warm_connections=1)
+    _wait_for(lambda: dependency_probes.warmed_up)
+    requests = predictor.requests
+    time.sleep(0.1)
+    assert predictor.requests == requests
+
+
+@pytest.mark.performance
+def test_required_predictor_follows_outages_and_recovery(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    dependency_probes = probes(interval=0.02, require_predictor=True)
+    _wait_for(lambda: dependency_probes.warmed_up)
+    assert dependency_probes.ready()[0] is True
+
+    predictor.config.error_rate = 1.0
+    _wait_for(lambda: not dependency_probes.ready()[0])
+    assert "500" in dependency_probes.ready()[1]
+
+    predictor.config.error_rate = 0.0
+    _wait_for(lambda: dependency_probes.ready()[0])
+
+
+@pytest.mark.performance
+def test_stale_probe_results_are_not_ready_when_required(monkeypatch, stub_server, probes):
+    predictor = stub_server("predictor")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    dependency_probes = probes(interval=60, max_age=0.05, require_predictor=True)
+    _wait_for(lambda: dependency_probes.warmed_up)
+    time.sleep(0.1)
+    assert dependency_probes.ready()[0] is False
+
+
+@pytest.mark.performance
+def test_malformed_predictor_url_finishes_warm_up(monkeypatch, probes):
+    monkeypatch.setenv("PREDICTOR_URLS", "http://127.0.0.1:abc/api/challenger/move?code=stub")
+    dependency_probes = probes(interval=60)
+    _wait_for(lambda: dependency_probes.warmed_up)
+    ready, details = dependency_probes.ready()
+    # served by the local strategy, the error shows in the readiness details
+    assert ready is True
+    assert "InvalidURL" in details
+
+    dependency_probes.require_predictor = True
+    assert dependency_probes.ready()[0] is False
+
+
+@pytest.mark.performance
+def test_pooled_predictor_calls(monkeypatch, stub_server, benchmark_report):
+    predictor = stub_server("predictor", prediction="rock")
+    monkeypatch.setenv("PREDICTOR_URLS", predictor.url)
+    monkeypatch.setattr(proxy_predictor, "pool", ConnectionPool())
+    proxy_predictor.get_pick_predicted("john")
+
+    start = time.perf_counter()
+    for _ in range(200):
+        proxy_predictor.get_pick_predicted("john")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    benchmark_report("pooled_predictor_calls", {"calls": 200, "mean_ms": elapsed_ms / 200})
+    # sequential calls keep reusing the same connection
+    assert proxy_predictor.pool.idle_connections() == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from app.pick import proxy_predictor
+from app.pick.routing import HashRing
+from app.pick.rpsls import RPSLS
+
+PLAYERS = [f"player{i}" for i in range(5000)]
+
+
+@pytest.mark.performance
+def test_adding_a_node_moves_about_one_nth_of_players():
+    nodes = [f"http://predictor-{i}" for i in range(4)]
+    ring = HashRing(nodes)
+    before = {player: ring.get_nodes(player)[0] for player in PLAYERS}
+    ring.add("http://predictor-4")
+    moved = [player for player in PLAYERS if ring.get_nodes(player)[0] != before[player]]
+
+    assert 0.1 < len(moved) / len(PLAYERS) < 0.3
+    assert all(ring.get_nodes(player)[0] == "http://predictor-4" for player in moved)
+    counts = [list(before.values()).count(node) for node in nodes]
+    assert min(counts) > len(PLAYERS) / len(nodes) / 2
+
+
+@pytest.mark.performance
+def test_failover_order_lists_every_node_once():
+    ring = HashRing(["a", "b", "c"])
+    assert sorted(ring.get_nodes("john")) == ["a", "b", "c"]
+    ring.remove("b")
+    assert sorted(ring.get_nodes("john")) == ["a", "c"]
+
+
+@pytest.mark.performance
+def test_players_stick_to_a_predictor_and_fail_over(monkeypatch, stub_server):
+    stubs = [stub_server("predictor", prediction=move) for move in ("rock", "paper", "spock")]
+    urls = [stub.url for stub in stubs]
+    monkeypatch.setenv("PREDICTOR_URLS", ",".join(urls))
+    predictions = {url: RPSLS[move] for url, move in zip(urls, ("rock", "paper", "spock"))}
+
+    owner = proxy_predictor._get_predictor_ring().get_nodes("john")
+    assert {proxy_predictor.get_pick_predicted("john") for _ in range(5)} == {predictions[owner[0]]}
+
+    stubs[urls.index(owner[0])].stop()
+    assert proxy_predictor.get_pick_predicted("john") == predictions[owner[1]]
@@ -0,0 +1,83 @@
+import json
+import time
+
+import msgpack
+import pytest
+
+from NextMove import next_move
+from app import app as flask_app
+from app.pick import proxy_predictor, rpsls_dto
+from app.pick.rpsls import RPSLS
+
+ITERATIONS = 20000
+
+
+@pytest.mark.performance
+def test_negotiated_predictions_round_trip_through_proxy():
+    for move, name in next_move.JSON_MOVES_ENCODING.items():
+        for content_type in next_move.SUPPORTED_CONTENT_TYPES:
+            body = next_move.ENCODED_PREDICTIONS[content_type][move]
+            assert proxy_predictor._parse_prediction(content_type, "utf-8", body) == RPSLS[name]
+        # JSON responses keep the historical body
+        assert next_move.ENCODED_PREDICTIONS[next_move.JSON_CONTENT_TYPE][move] == \
+            f'{{"prediction": "{name}"}}'.encode()
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("accept, expected", [
+    (None, "application/json"),
+    ("*/*", "application/json"),
+    ("application/msgpack", "application/msgpack"),
+    ("application/json;q=0.5, application/x-rpsls-move", "application/x-rpsls-move"),
+    ("text/html", "application/json"),
+])
+def test_predictor_content_negotiation(accept, expected):
+    assert next_move.negotiate_content_type(accept) == expected
+
+
+@pytest.mark.performance
+def test_pick_content_negotiation(monkeypatch):
+    monkeypatch.setenv("PICK_STRATEGY", "spock")
+    client = flask_app.test_client()
+
+    response = client.get("/pick")
+    assert response.mimetype == "application/json"
+    assert response.get_json()["text"] == "spock"
+
+    response = client.get("/pick", headers={"Accept": "application/msgpack"})
+    assert msgpack.unpackb(response.data)["value"] == RPSLS.spock.value
+
+    response = client.get("/pick", headers={"Accept": "application/x-rpsls-move"})
+    assert response.data == bytes([RPSLS.spock.value])
+
+
+def _per_request_us(call):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        call()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+@pytest.mark.performance
+def test_serialization_cost_per_request(benchmark_report):
+    json_body = json.dumps({"prediction": "spock"}).encode()
+    msgpack_body = msgpack.packb({"prediction": "spock"})
+    with flask_app.test_request_context():
+        from flask import jsonify
+        results = {
+            # what the predictor did for every request before the responses were pre-encoded
+            "predictor_json_dumps_us": _per_request_us(lambda: json.dumps({"prediction": "spock"})),
+            "predictor_pre_encoded_us": _per_request_us(
+                lambda: next_move.ENCODED_PREDICTIONS[next_move.MSGPACK_CONTENT_TYPE]["V"]),
+            "proxy_parse_json_us": _per_request_us(
+                lambda: proxy_predictor._parse_prediction("application/json", "utf-8", json_body)),
+            "proxy_parse_msgpack_us": _per_request_us(
+                lambda: proxy_predictor._parse_prediction("application/msgpack", "utf-8", msgpack_body)),
+            "proxy_parse_move_us": _per_request_us(
+                lambda: proxy_predictor._parse_prediction("application/x-rpsls-move", "utf-8", b"\x04")),
+            "pick_jsonify_us": _per_request_us(
+                lambda: jsonify(text="spock", value=4, player="host", playerType="python")),
+            "pick_pre_encoded_us": _per_request_us(
+                lambda: rpsls_dto.get_rpsls_dto_response(RPSLS.spock, "application/x-rpsls-move")),
+        }
+    benchmark_report("serialization", results)
@@ -0,0 +1,104 @@
+import importlib.util
+import os
+
+import pytest
+
+from NextMove import next_move, shadow
+from NextMove.next_move import _predict_next_move
+from NextMove.prediction_memo import PredictionMemo
+from NextMove.shadow import ShadowEvaluator
+
+REPORT_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "shadow-report.py")
+
+
+def _shadow_report():
+    spec = importlib.util.spec_from_file_location("shadow_report", REPORT_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.performance
+def test_shadow_records_agreement_and_next_round_outcome(tmp_path):
+    records_path = tmp_path / "shadow.jsonl"
+    # candidate always plays paper
+    evaluator = ShadowEvaluator("paper", lambda challenger_moves, human_moves: "P", str(records_path))
+
+    challenger, human = "RPSVL", "RRRRR"
+    primary = _predict_next_move(challenger, human)
+    evaluator.observe("john", challenger, human, primary, 0.001)
+    evaluator.observe("john", challenger + primary, human + "R", "S", 0.001)
+    evaluator.join()
+
+    report = _shadow_report()
+    summary = report.summarize(report.load(records_path))
+    assert summary["predictions"] == 2
+    assert summary["agreement_rate"] == (0.5 if primary == "P" else 0.0)
+    assert summary["rounds_scored"] == 1
+    # paper beats the rock played in the next round
+    assert summary["candidate_results"]["win"] == 1.0
+
+
+@pytest.mark.performance
+def test_shadow_drops_when_worker_is_behind(tmp_path):
+    evaluator = ShadowEvaluator("scalar", _predict_next_move, str(tmp_path / "shadow.jsonl"), max_queue=1)
+    for _ in range(50):
+        evaluator.observe("john", "RPS" * 20, "SPR" * 20, "R", 0.001)
+    evaluator.join()
+    assert evaluator.dropped > 0
+
+
+@pytest.fixture
+def unconfigured_shadow(monkeypatch):
+    monkeypatch.setattr(shadow, "_configured", False)
+    monkeypatch.setattr(shadow, "_evaluator", None)
+
+
+@pytest.mark.performance
+def test_unknown_shadow_engine_disables_shadow_mode(monkeypatch, unconfigured_shadow, caplog):
+    monkeypatch.setenv("SHADOW_ENGINE", "typo")
+    assert shadow.get_shadow_evaluator() is None
+    assert "Unknown SHADOW_ENGINE 'typo'" in caplog.text
+    # checked once, not on every request
+    caplog.clear()
+    assert shadow.get_shadow_evaluator() is None
+    assert caplog.text == ""
+
+
+@pytest.mark.performance
+def test_shadow_failures_never_reach_the_prediction(monkeypatch):
+    class FailingShadow:
+        def observe(self, *args):
+            raise RuntimeError("shadow failure")
+
+    monkeypatch.setattr(next_move, "_get_player_games", lambda player_name: ("RPSVL", "RRRRR"))
+    monkeypatch.setattr(next_move, "get_shadow_evaluator", lambda: FailingShadow())
+    assert next_move.predict("john") in next_move.ENCODED_PREDICTIONS[next_move.JSON_CONTENT_TYPE].values()
+
+
+@pytest.mark.performance
+def test_memo_hits_have_no_primary_latency(monkeypatch, tmp_path):
+    class RecordingShadow:
+        def __init__(self):
+            self.primary_seconds = []
+
+        def observe(self, player_name, challenger_moves, human_moves, primary_move, primary_seconds):
+            self.primary_seconds.append(primary_seconds)
+
+    recording = RecordingShadow()
+    memo = PredictionMemo()
+    monkeypatch.setattr(next_move, "_get_player_games", lambda player_name: ("RPSVL", "RRRRR"))
+    monkeypatch.setattr(next_move, "get_shadow_evaluator", lambda: recording)
+    monkeypatch.setattr(next_move, "get_prediction_memo", lambda: memo)
+    next_move.predict("john")
+    next_move.predict("jane")
+    assert recording.primary_seconds[0] > 0
+    assert recording.primary_seconds[1] is None
+
+    report = _shadow_report()
+    records = [{"type": "prediction", "candidate_engine": "scalar", "agree": True, "memo_hit": memo_hit,
+                "primary_ms": primary_ms, "candidate_ms": 1.0}
+               for memo_hit, primary_ms in ((False, 2.0), (True, None), (False, 4.0))]
+    summary = report.summarize(records)
+    assert summary["memo_hits"] == 1
+    assert summary["primary_latency"]["mean_ms"] == 3.0
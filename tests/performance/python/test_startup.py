@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import PYTHON_PLAYER_DIR
+
+# startup budgets of the python player, a slower start delays HPA scale out
+IMPORT_BUDGET_MS = float(os.getenv("PYTHON_PLAYER_IMPORT_BUDGET_MS", "600"))
+FIRST_REQUEST_BUDGET_MS = float(os.getenv("PYTHON_PLAYER_FIRST_REQUEST_BUDGET_MS", "1000"))
+
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/pick')
+assert response.status_code == 200
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000,
+                  'first_request_ms': (done - imported) * 1000,
+                  'lazy_modules_loaded': [name for name in ('healthcheck', 'applicationinsights')
+                                          if name in sys.modules]}))
+"""
+
+
+def _player_env():
+    env = dict(os.environ, PICK_STRATEGY="rock")
+    env.pop("APPLICATION_INSIGHTS_IKEY", None)
+    return env
+
+
+def _cumulative_import_ms(module):
+    """Cumulative import time of module as reported by python -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PYTHON_PLAYER_DIR, env=_player_env(), capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+@pytest.mark.performance
+def test_python_player_startup_budget(benchmark_report):
+    import_ms = _cumulative_import_ms("app")
+    result = subprocess.run([sys.executable, "-c", FIRST_REQUEST_SCRIPT],
+                            cwd=PYTHON_PLAYER_DIR, env=_player_env(), capture_output=True, text=True, check=True)
+    first_request = json.loads(result.stdout.strip().splitlines()[-1])
+
+    benchmark_report("python_player_startup", {"importtime_app_ms": import_ms, **first_request,
+                                               "import_budget_ms": IMPORT_BUDGET_MS,
+                                               "first_request_budget_ms": FIRST_REQUEST_BUDGET_MS})
+    assert first_request["lazy_modules_loaded"] == []
+    assert import_ms < IMPORT_BUDGET_MS
+    assert first_request["import_ms"] + first_request["first_request_ms"] < FIRST_REQUEST_BUDGET_MS
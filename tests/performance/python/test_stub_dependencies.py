@@ -0,0 +1,76 @@
+import itertools
+import statistics
+import time
+
+import pytest
+
+from NextMove.next_move import _get_player_games
+from app.pick import proxy_predictor
+from app.pick.rpsls import RPSLS
+
+
+def _latencies_ms(call, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+@pytest.mark.performance
+def test_game_history_from_stub_game_manager(monkeypatch, stub_server):
+    game_manager = stub_server("game-manager", history_size=150, seed=1)
+    monkeypatch.setenv("GAME_MANAGER_URI", game_manager.url)
+    challenger_moves, human_moves = _get_player_games("john")
+    assert len(challenger_moves) == len(human_moves) == 150
+
+
+@pytest.mark.performance
+def test_predictor_errors_fail_over_to_next_stub(monkeypatch, stub_server):
+    failing = stub_server("predictor", error_rate=1.0)
+    healthy = stub_server("predictor", prediction="lizard")
+    monkeypatch.setenv("PREDICTOR_URLS", f"{failing.url},{healthy.url}")
+    monkeypatch.setenv("PREDICTOR_MAX_ATTEMPTS", "2")
+    for player in ("john", "jane", "joe", "jim"):
+        assert proxy_predictor.get_pick_predicted(player) == RPSLS.lizard
+
+
+@pytest.mark.performance
+def test_slow_predictor_times_out(monkeypatch, stub_server):
+    slow = stub_server("predictor", latency="fixed:500")
+    monkeypatch.setenv("PREDICTOR_URLS", slow.url)
+    monkeypatch.setenv("PREDICTOR_TIMEOUT_SECONDS", "0.1")
+    start = time.perf_counter()
+    with pytest.raises(OSError):
+        proxy_predictor.get_pick_predicted("john")
+    assert time.perf_counter() - start < 0.4
+
+
+@pytest.mark.performance
+def test_dependency_latency_offline(monkeypatch, stub_server, benchmark_report):
+    results = {}
+    scenarios = {
+        "game_manager_uniform_5_15ms_200_rounds": ("game-manager", dict(latency="uniform:5:15", history_size=200)),
+        "game_manager_slow_drip": ("game-manager", dict(history_size=50, drip_chunk=64, drip_delay_ms=2)),
+        "predictor_exponential_10ms": ("predictor", dict(latency="exponential:10", seed=3)),
+        "predictor_50pct_errors_failover": ("predictor", dict(error_rate=0.5, seed=4)),
+    }
+    players = itertools.cycle(f"player{i}" for i in range(10))
+    for name, (kind, config) in scenarios.items():
+        stub = stub_server(kind, **config)
+        if kind == "game-manager":
+            monkeypatch.setenv("GAME_MANAGER_URI", stub.url)
+            call = lambda: _get_player_games("john")
+        else:
+            predictor_urls = [stub.url]
+            if stub.config.error_rate:
+                # a healthy second node takes over the failed requests
+                predictor_urls.append(stub_server("predictor").url)
+            monkeypatch.setenv("PREDICTOR_URLS", ",".join(predictor_urls))
+            call = lambda: proxy_predictor.get_pick_predicted(next(players))
+        latencies = _latencies_ms(call, 30)
+        results[name] = {"mean_ms": statistics.mean(latencies),
+                         "p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1],
+                         "stub_requests": stub.requests}
+    benchmark_report("stub_dependencies", results)
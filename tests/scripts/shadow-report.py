@@ -0,0 +1,74 @@
+"""Summarizes the records written by the NextMove shadow mode.
+
+usage: python tests/scripts/shadow-report.py [records.jsonl] [--json]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+from collections import Counter
+
+DEFAULT_RECORDS = os.path.join(tempfile.gettempdir(), "shadow-predictions.jsonl")
+
+
+def _percentile(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+
+def _latency(values):
+    return {"mean_ms": statistics.mean(values) if values else None,
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95)}
+
+
+def summarize(records):
+    predictions = [r for r in records if r.get("type") == "prediction"]
+    outcomes = [r for r in records if r.get("type") == "outcome"]
+    summary = {
+        "candidate_engines": sorted({r["candidate_engine"] for r in predictions}),
+        "predictions": len(predictions),
+        "agreement_rate": sum(r["agree"] for r in predictions) / len(predictions) if predictions else None,
+        # memo hits were not computed, they would skew the primary latency
+        "memo_hits": sum(1 for r in predictions if r.get("memo_hit")),
+        "primary_latency": _latency([r["primary_ms"] for r in predictions
+                                     if not r.get("memo_hit") and r.get("primary_ms") is not None]),
+        "candidate_latency": _latency([r["candidate_ms"] for r in predictions]),
+        "rounds_scored": len(outcomes),
+        "errors": sum(1 for r in records if r.get("type") == "error"),
+    }
+    for engine in ("primary", "candidate"):
+        results = Counter(r[f"{engine}_result"] for r in outcomes)
+        summary[f"{engine}_results"] = {result: results[result] / len(outcomes) if outcomes else None
+                                        for result in ("win", "tie", "loss")}
+    return summary
+
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(args):
+    as_json = "--json" in args
+    paths = [arg for arg in args if arg != "--json"]
+    summary = summarize(load(paths[0] if paths else DEFAULT_RECORDS))
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"Candidate engine(s): {', '.join(summary['candidate_engines']) or '-'}")
+    print(f"Predictions: {summary['predictions']}  agreement: {summary['agreement_rate']}  "
+          f"memo hits: {summary['memo_hits']}")
+    for engine in ("primary", "candidate"):
+        latency = summary[f"{engine}_latency"]
+        results = summary[f"{engine}_results"]
+        print(f"{engine:>9}: p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  "
+              f"win {results['win']}  tie {results['tie']}  loss {results['loss']}")
+    print(f"Rounds scored: {summary['rounds_scored']}  errors: {summary['errors']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])